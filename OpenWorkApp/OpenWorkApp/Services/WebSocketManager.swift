@@ -60,10 +60,15 @@ class WebSocketManager: NSObject {
     
     private func handleMessage(_ text: String) {
         guard let data = text.data(using: .utf8),
-              let json = try? JSONSerialization.jsonObject(with: data) as? [String: Any] else {
+              let json = try? JSONSerialization.jsonObject(with: data) else {
             return
         }
-        messageHandler?(json)
+        // The server coalesces bursts of events into a JSON array
+        if let batch = json as? [[String: Any]] {
+            batch.forEach { messageHandler?($0) }
+        } else if let message = json as? [String: Any] {
+            messageHandler?(message)
+        }
     }
     
     private func handleDisconnect() {
@@ -16,9 +16,12 @@ from openwork.agent.loop import AgentLoop
 from openwork.tools.file_tool import FileTool
 from openwork.tools.bash_tool import BashTool
 from openwork.tools.search_tool import SearchTool
+from openwork.runtime import enable_eager_tasks, install_uvloop
 
 
 async def main():
+    enable_eager_tasks()
+    
     api_key = os.getenv("OPENAI_API_KEY") or os.getenv("ANTHROPIC_API_KEY")
     if not api_key:
         print("Please set OPENAI_API_KEY or ANTHROPIC_API_KEY environment variable")
@@ -65,4 +68,5 @@ async def main():
 
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
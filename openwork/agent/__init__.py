@@ -3,13 +3,23 @@
 from openwork.agent.loop import AgentLoop
 from openwork.agent.context import Context
 from openwork.agent.orchestrator import TaskOrchestrator
-from openwork.agent.subagent import SubagentManager, SubagentTask, SubagentResult
+from openwork.agent.subagent import (
+    SubagentManager,
+    SubagentOutputTool,
+    SubagentTask,
+    SubagentResult,
+    SubagentTool,
+    create_subagent_tools,
+)
 
 __all__ = [
     "AgentLoop",
     "Context",
     "TaskOrchestrator",
     "SubagentManager",
+    "SubagentOutputTool",
     "SubagentTask",
     "SubagentResult",
+    "SubagentTool",
+    "create_subagent_tools",
 ]
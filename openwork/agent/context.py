@@ -2,12 +2,43 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+import os
+from collections import deque
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from enum import Enum
+from functools import lru_cache
 from typing import Any
 from pathlib import Path
 
+MAX_TOOL_OUTPUT_CHARS = 4000
+
+
+def truncate_middle(text: str, limit: int) -> str:
+    """Keep the head and tail of text, eliding the middle past limit chars."""
+    if len(text) <= limit:
+        return text
+    half = limit // 2
+    omitted = len(text) - 2 * half
+    return f"{text[:half]}\n...[truncated {omitted} chars]...\n{text[-half:]}"
+
+
+def resolve_path(path: str) -> Path:
+    """
+    Resolve a path, memoized across runs.
+    
+    Allowed-path roots are usually the same workspace for many tasks, so
+    this keeps the resolve() syscalls off the start of every run. Relative
+    paths are made absolute first, against the current working directory,
+    so a later chdir never returns a stale resolution.
+    """
+    return _resolve_absolute(os.path.abspath(path))
+
+
+@lru_cache(maxsize=512)
+def _resolve_absolute(path: str) -> Path:
+    return Path(path).resolve()
+
 
 class MessageRole(str, Enum):
     SYSTEM = "system"
@@ -16,24 +47,41 @@ class MessageRole(str, Enum):
     TOOL = "tool"
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
-    """A single message in the conversation history."""
+    """
+    A single message in the conversation history.
+    
+    Tool messages leave content as None and point at their Observation
+    through content_ref instead of holding a second copy of the output.
+    """
     role: MessageRole
-    content: str
+    content: str | None
     timestamp: datetime = field(default_factory=datetime.now)
     metadata: dict[str, Any] = field(default_factory=dict)
+    content_ref: int | None = None
+    role_value: str = field(init=False, repr=False)
+    
+    def __post_init__(self) -> None:
+        self.role = MessageRole(self.role)
+        self.role_value = self.role.value
 
 
-@dataclass
+@dataclass(slots=True)
 class Observation:
-    """An observation from tool execution."""
+    """
+    An observation from tool execution.
+    
+    content_type is carried over from the ToolResult; output marked with
+    one is already serialized text and is shown to the LLM as is.
+    """
     tool_name: str
     input_params: dict[str, Any]
     output: Any
     success: bool
     error: str | None = None
     timestamp: datetime = field(default_factory=datetime.now)
+    content_type: str | None = None
 
 
 @dataclass
@@ -46,64 +94,155 @@ class Context:
     - Tool observations
     - Allowed paths for file operations
     - Task state
+    
+    Tool output is capped at max_tool_output_chars (head and tail kept)
+    before it enters the conversation. The full payload stays on the
+    Observation unless keep_full_output is False, in which case a capped
+    copy of the observation is stored instead.
+    
+    Non-system messages live in a bounded deque that evicts the oldest
+    entry on append; system messages are pinned separately and never
+    evicted.
     """
     task: str
     allowed_paths: list[Path] = field(default_factory=list)
-    messages: list[Message] = field(default_factory=list)
+    messages: deque[Message] = field(default_factory=deque)
     observations: list[Observation] = field(default_factory=list)
     metadata: dict[str, Any] = field(default_factory=dict)
     max_history_length: int = 50
+    max_tool_output_chars: int = MAX_TOOL_OUTPUT_CHARS
+    keep_full_output: bool = True
+    _system_messages: list[Message] = field(default_factory=list, init=False, repr=False)
+    _llm_prefix: list[dict[str, str]] = field(default_factory=list, init=False, repr=False)
+    _llm_tail: deque[dict[str, str] | Message] = field(default_factory=deque, init=False, repr=False)
+    _observation_cache: dict[str, Any] = field(default_factory=dict, init=False, repr=False)
+    _allowed_roots: frozenset[str] = field(default_factory=frozenset, init=False, repr=False)
+    _allowed_prefixes: tuple[str, ...] = field(default_factory=tuple, init=False, repr=False)
     
     def __post_init__(self) -> None:
+        roots = [str(resolve_path(str(p))) for p in self.allowed_paths]
+        self._allowed_roots = frozenset(roots)
+        self._allowed_prefixes = tuple(
+            root if root.endswith(os.sep) else root + os.sep
+            for root in roots
+        )
+        initial = list(self.messages)
+        self.messages = deque(maxlen=self.max_history_length)
+        self._llm_tail = deque(maxlen=self.max_history_length)
+        for message in initial:
+            self._append(message)
         if self.task:
             self.add_message(MessageRole.USER, self.task)
     
     def add_message(self, role: MessageRole, content: str, **metadata: Any) -> None:
         """Add a message to the conversation history."""
-        self.messages.append(Message(
+        self._append(Message(
             role=role,
             content=content,
             metadata=metadata
         ))
-        self._trim_history()
+    
+    def _append(self, message: Message) -> None:
+        """
+        Store a message, pinning system messages outside the window.
+        
+        The LLM-formatted dict is built once here and kept alongside the
+        message, so the tail view evicts in lockstep with the history.
+        Tool messages are kept as the message itself and formatted from
+        their observation once, when the LLM view is next requested.
+        """
+        if message.role_value == "system":
+            self._system_messages.append(message)
+            self._llm_prefix.append({"role": "system", "content": message.content})
+        else:
+            self.messages.append(message)
+            self._llm_tail.append(
+                message if message.content_ref is not None
+                else {"role": message.role_value, "content": message.content}
+            )
     
     def add_observation(self, observation: Observation) -> None:
         """Add a tool observation."""
+        if observation.success and not self.keep_full_output and observation.content_type is None:
+            observation = replace(observation, output=truncate_middle(
+                str(observation.output), self.max_tool_output_chars
+            ))
         self.observations.append(observation)
-        tool_message = f"Tool: {observation.tool_name}\n"
+        self._append(Message(
+            role=MessageRole.TOOL,
+            content=None,
+            content_ref=len(self.observations) - 1,
+            metadata={"tool_name": observation.tool_name},
+        ))
+    
+    def get_message_content(self, message: Message) -> str:
+        """Get a message's text, formatting referenced observations."""
+        if message.content_ref is None:
+            return message.content
+        return self._format_observation(self.observations[message.content_ref])
+    
+    def _format_observation(self, observation: Observation) -> str:
+        """Format an observation as a TOOL message for the LLM."""
         if observation.success:
-            tool_message += f"Output: {observation.output}"
-        else:
-            tool_message += f"Error: {observation.error}"
-        self.add_message(MessageRole.TOOL, tool_message, tool_name=observation.tool_name)
+            if observation.content_type is not None:
+                # Serialized output is inserted verbatim; cutting it in the
+                # middle would leave invalid JSON
+                return f"Tool: {observation.tool_name}\nOutput: {observation.output}"
+            output = truncate_middle(str(observation.output), self.max_tool_output_chars)
+            return f"Tool: {observation.tool_name}\nOutput: {output}"
+        error = truncate_middle(str(observation.error), self.max_tool_output_chars)
+        return f"Tool: {observation.tool_name}\nError: {error}"
     
     def is_path_allowed(self, path: Path) -> bool:
-        """Check if a path is within allowed paths."""
-        path = path.resolve()
-        return any(
-            path == allowed or allowed in path.parents
-            for allowed in self.allowed_paths
-        )
+        """
+        Check if a path is within allowed paths.
+        
+        Allowed roots are resolved once when the context is created, so
+        each check is a realpath plus a string prefix match.
+        """
+        resolved = os.path.realpath(path)
+        return resolved in self._allowed_roots or resolved.startswith(self._allowed_prefixes)
     
     def get_messages_for_llm(self) -> list[dict[str, str]]:
-        """Get messages formatted for LLM API."""
-        return [
-            {"role": msg.role.value, "content": msg.content}
-            for msg in self.messages
-        ]
-    
-    def _trim_history(self) -> None:
-        """Trim conversation history if it exceeds max length."""
-        if len(self.messages) > self.max_history_length:
-            system_messages = [m for m in self.messages if m.role == MessageRole.SYSTEM]
-            recent_messages = self.messages[-self.max_history_length + len(system_messages):]
-            self.messages = system_messages + recent_messages
+        """
+        Get messages formatted for LLM API.
+        
+        System messages form a static prefix and are always emitted first,
+        so providers with prompt caching see the same prefix every
+        iteration. Everything else follows in conversation order.
+        """
+        return [*self._llm_prefix, *self._materialize_tail()]
+    
+    def get_static_prefix(self) -> list[dict[str, str]]:
+        """Get the system messages that make up the cacheable prefix."""
+        return list(self._llm_prefix)
+    
+    def get_dynamic_tail(self) -> list[dict[str, str]]:
+        """Get the per-iteration conversation that follows the prefix."""
+        return self._materialize_tail()
+    
+    def _materialize_tail(self) -> list[dict[str, str]]:
+        """
+        Build the LLM view of the tail, formatting new tool messages.
+        
+        Each tool message is formatted the first time the view is built and
+        replaced by its dict, so later iterations reuse it. Messages not yet
+        formatted are always the newest ones, at the end of the tail.
+        """
+        tail = self._llm_tail
+        first = len(tail)
+        while first and not isinstance(tail[first - 1], dict):
+            first -= 1
+        for index in range(first, len(tail)):
+            message = tail[index]
+            tail[index] = {"role": message.role_value, "content": self.get_message_content(message)}
+        return list(tail)
     
     def get_summary(self) -> str:
         """Get a summary of the current context state."""
         return (
             f"Task: {self.task}\n"
-            f"Messages: {len(self.messages)}\n"
+            f"Messages: {len(self._system_messages) + len(self.messages)}\n"
             f"Observations: {len(self.observations)}\n"
             f"Allowed paths: {[str(p) for p in self.allowed_paths]}"
         )
@@ -8,38 +8,58 @@ Gather Context -> Take Action -> Verify Work -> Repeat
 from __future__ import annotations
 
 import asyncio
+import copy
+import inspect
+import json
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, TYPE_CHECKING
+from typing import Any, Iterable, TYPE_CHECKING
 
-from openwork.agent.context import Context, MessageRole, Observation
+from openwork.agent.context import Context, MessageRole, Observation, resolve_path
+
+try:
+    import orjson as _json
+except ImportError:
+    _json = json
 
 if TYPE_CHECKING:
     from openwork.llm.base import BaseLLM
+    from openwork.llm.cache import LLMCache
     from openwork.tools.base import BaseTool, ToolResult
 
 
+def _concurrency_safe(tool: Any, params: dict[str, Any]) -> bool:
+    """Ask a tool whether a call may overlap others; tools that cannot say are unsafe."""
+    check = getattr(tool, "is_concurrency_safe", None)
+    if check is None:
+        return False
+    try:
+        return bool(check(**params))
+    except Exception:
+        return False
+
+
 class AgentState(str, Enum):
     IDLE = "idle"
     THINKING = "thinking"
     EXECUTING = "executing"
-    VERIFYING = "verifying"
     COMPLETE = "complete"
     ERROR = "error"
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentDecision:
     """Decision made by the LLM."""
     thought: str
     tool_name: str | None = None
     tool_params: dict[str, Any] = field(default_factory=dict)
+    tool_calls: list[dict[str, Any]] = field(default_factory=list)
     is_complete: bool = False
     final_answer: str | None = None
     needs_verification: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentResult:
     """Result of agent execution."""
     success: bool
@@ -85,6 +105,7 @@ Respond in this JSON format:
     "thought": "your reasoning about what to do next",
     "tool": "tool_name" or null if no tool needed,
     "params": {{}},  // tool parameters if using a tool
+    "tools": [{{"tool": "tool_name", "params": {{}}}}],  // optional: several independent calls to run in parallel
     "is_complete": false,  // true when task is done
     "answer": "final answer to user" or null
 }}
@@ -93,31 +114,92 @@ Respond in this JSON format:
     def __init__(
         self,
         llm: BaseLLM,
-        tools: list[BaseTool],
+        tools: Iterable[BaseTool],
         max_iterations: int = 20,
         verbose: bool = False,
+        cache: LLMCache | None = None,
+        prompt_cache_key: str | None = None,
     ):
         self.llm = llm
         self.tools = {tool.name: tool for tool in tools}
         self.max_iterations = max_iterations
         self.verbose = verbose
+        self.cache = cache
+        self._llm_kwargs = {"prompt_cache_key": prompt_cache_key} if prompt_cache_key else {}
+        self._tool_params = {
+            name: self._accepted_params(tool) for name, tool in self.tools.items()
+        }
+        self._tools_description = self._get_tools_description()
+        self._system_prompt = self.SYSTEM_PROMPT.format(tools=self._tools_description)
         self.state = AgentState.IDLE
-        self._callbacks: list[callable] = []
+        self._sync_callbacks: list[callable] = []
+        self._async_callbacks: list[callable] = []
+    
+    def reset_state(self) -> None:
+        """Return the loop to IDLE so it can be reused for another run."""
+        self.state = AgentState.IDLE
+    
+    def clone(self) -> AgentLoop:
+        """
+        Create an idle loop with the same LLM, tools, settings and callbacks.
+        
+        The read-only tool tables and system prompt are shared rather than
+        rebuilt; state and the callback lists are the clone's own.
+        """
+        clone = copy.copy(self)
+        clone.state = AgentState.IDLE
+        clone._sync_callbacks = list(self._sync_callbacks)
+        clone._async_callbacks = list(self._async_callbacks)
+        return clone
     
     def add_callback(self, callback: callable) -> None:
         """Add a callback for state changes."""
-        self._callbacks.append(callback)
+        if asyncio.iscoroutinefunction(callback):
+            self._async_callbacks.append(callback)
+        else:
+            self._sync_callbacks.append(callback)
     
     async def _notify_callbacks(self, event: str, data: Any = None) -> None:
-        """Notify all registered callbacks."""
-        for callback in self._callbacks:
+        """
+        Notify all registered callbacks.
+        
+        Sync callbacks run inline; async callbacks run concurrently and
+        their exceptions are discarded.
+        """
+        for callback in self._sync_callbacks:
             try:
-                if asyncio.iscoroutinefunction(callback):
-                    await callback(event, data)
-                else:
-                    callback(event, data)
+                callback(event, data)
             except Exception:
                 pass
+        if self._async_callbacks:
+            await asyncio.gather(
+                *(callback(event, data) for callback in self._async_callbacks),
+                return_exceptions=True,
+            )
+    
+    @staticmethod
+    def _accepted_params(tool: BaseTool) -> frozenset[str] | None:
+        """
+        Get the parameter names a tool's execute() accepts.
+        
+        Tools taking **kwargs are limited to the properties declared in
+        their JSON schema. Returns None when nothing constrains the call.
+        """
+        names = set()
+        takes_kwargs = False
+        for name, param in inspect.signature(tool.execute).parameters.items():
+            if param.kind is inspect.Parameter.VAR_KEYWORD:
+                takes_kwargs = True
+            elif param.kind is not inspect.Parameter.VAR_POSITIONAL:
+                names.add(name)
+        
+        if takes_kwargs:
+            properties = getattr(tool, "parameters", {}).get("properties")
+            if properties is None:
+                return None
+            names.update(properties)
+        
+        return frozenset(names)
     
     def _get_tools_description(self) -> str:
         """Get formatted description of available tools."""
@@ -137,107 +219,183 @@ Respond in this JSON format:
         Returns:
             AgentResult with the outcome of the task
         """
-        from pathlib import Path
-        
         context = Context(
             task=task,
-            allowed_paths=[Path(p).resolve() for p in (allowed_paths or [])],
+            allowed_paths=[resolve_path(str(p)) for p in (allowed_paths or [])],
         )
         
-        system_prompt = self.SYSTEM_PROMPT.format(tools=self._get_tools_description())
-        context.add_message(MessageRole.SYSTEM, system_prompt)
+        context.add_message(MessageRole.SYSTEM, self._system_prompt, cacheable=True)
         
+        observations = context.observations
+        notify = self._notify_callbacks
+        verbose = self.verbose
+        state = self.state
         iterations = 0
         
         try:
-            while iterations < self.max_iterations:
-                iterations += 1
-                self.state = AgentState.THINKING
-                await self._notify_callbacks("thinking", {"iteration": iterations})
+            for iterations in range(1, self.max_iterations + 1):
+                if state is not AgentState.THINKING:
+                    state = self.state = AgentState.THINKING
+                await notify("thinking", {"iteration": iterations})
                 
                 decision = await self._get_decision(context)
                 
-                if self.verbose:
+                if verbose:
                     print(f"[Iteration {iterations}] Thought: {decision.thought}")
                 
                 if decision.is_complete:
                     self.state = AgentState.COMPLETE
-                    await self._notify_callbacks("complete", {"answer": decision.final_answer})
+                    await notify("complete", {"answer": decision.final_answer})
                     return AgentResult(
                         success=True,
                         output=decision.final_answer or "Task completed.",
-                        observations=context.observations,
+                        observations=observations,
                         iterations=iterations,
                     )
                 
-                if decision.tool_name:
-                    self.state = AgentState.EXECUTING
-                    await self._notify_callbacks("executing", {
-                        "tool": decision.tool_name,
-                        "params": decision.tool_params
-                    })
-                    
-                    result = await self._execute_tool(
-                        decision.tool_name,
-                        decision.tool_params,
-                        context,
-                    )
+                tool_calls = decision.tool_calls
+                if tool_calls:
+                    state = self.state = AgentState.EXECUTING
+                    for call in tool_calls:
+                        await notify("executing", {
+                            "tool": call["name"],
+                            "params": call["params"]
+                        })
                     
-                    observation = Observation(
-                        tool_name=decision.tool_name,
-                        input_params=decision.tool_params,
-                        output=result.output if result.success else None,
-                        success=result.success,
-                        error=result.error,
-                    )
-                    context.add_observation(observation)
+                    results = await self._execute_tool_calls(tool_calls, context)
                     
-                    if self.verbose:
-                        status = "Success" if result.success else f"Error: {result.error}"
-                        print(f"[Tool: {decision.tool_name}] {status}")
+                    for call, result in zip(tool_calls, results):
+                        observation = Observation(
+                            tool_name=call["name"],
+                            input_params=call["params"],
+                            output=result.output if result.success else None,
+                            success=result.success,
+                            error=result.error,
+                            content_type=result.content_type if result.success else None,
+                        )
+                        context.add_observation(observation)
+                        
+                        if verbose:
+                            status = "Success" if result.success else f"Error: {result.error}"
+                            print(f"[Tool: {call['name']}] {status}")
             
             self.state = AgentState.ERROR
             return AgentResult(
                 success=False,
                 output="",
-                observations=context.observations,
+                observations=observations,
                 error=f"Max iterations ({self.max_iterations}) reached",
                 iterations=iterations,
             )
             
         except Exception as e:
             self.state = AgentState.ERROR
-            await self._notify_callbacks("error", {"error": str(e)})
+            await notify("error", {"error": str(e)})
             return AgentResult(
                 success=False,
                 output="",
-                observations=context.observations,
+                observations=observations,
                 error=str(e),
                 iterations=iterations,
             )
     
     async def _get_decision(self, context: Context) -> AgentDecision:
         """Get the next decision from the LLM."""
-        import json
-        
         messages = context.get_messages_for_llm()
-        response = await self.llm.generate(messages)
+        response = await self._generate(messages)
         
         try:
-            data = json.loads(response)
-            return AgentDecision(
-                thought=data.get("thought", ""),
-                tool_name=data.get("tool"),
-                tool_params=data.get("params", {}),
-                is_complete=data.get("is_complete", False),
-                final_answer=data.get("answer"),
-            )
+            data = _json.loads(response)
         except json.JSONDecodeError:
             return AgentDecision(
                 thought=response,
                 is_complete=True,
                 final_answer=response,
             )
+        
+        get = data.get
+        tools = get("tools")
+        tool = get("tool")
+        if tools:
+            tool_calls = [
+                {
+                    "name": call.get("tool") or call.get("name"),
+                    "params": call.get("params") or {},
+                }
+                for call in tools
+            ]
+        elif tool:
+            tool_calls = [{"name": tool, "params": get("params") or {}}]
+        else:
+            tool_calls = []
+        
+        first = tool_calls[0] if tool_calls else None
+        return AgentDecision(
+            thought=get("thought", ""),
+            tool_name=first["name"] if first else None,
+            tool_params=first["params"] if first else {},
+            tool_calls=tool_calls,
+            is_complete=get("is_complete", False),
+            final_answer=get("answer"),
+        )
+    
+    async def _generate(self, messages: list[dict[str, str]]) -> str:
+        """Call the LLM, going through the response cache when enabled."""
+        # Only deterministic sampling can safely reuse a previous response
+        if self.cache is None or getattr(self.llm, "temperature", 0) != 0:
+            return await self.llm.generate(messages, **self._llm_kwargs)
+        
+        model = getattr(self.llm, "model", type(self.llm).__name__)
+        key = self.cache.cache_key(model, messages, list(self.tools))
+        cached = await self.cache.get(key, messages)
+        if cached is not None:
+            return cached
+        
+        response = await self.llm.generate(messages, **self._llm_kwargs)
+        await self.cache.set(key, response, messages)
+        return response
+    
+    async def _execute_tool_calls(
+        self,
+        tool_calls: list[dict[str, Any]],
+        context: Context,
+    ) -> list[ToolResult]:
+        """
+        Execute tool calls, overlapping independent ones.
+        
+        Consecutive concurrency-safe calls run together via asyncio.gather;
+        any call that may modify state runs alone. Results are returned in
+        the original call order.
+        """
+        from openwork.tools.base import ToolResult
+        
+        results: list[ToolResult] = []
+        batch: list[dict[str, Any]] = []
+        
+        async def flush() -> None:
+            outcomes = await asyncio.gather(
+                *(self._execute_tool(c["name"], c["params"], context) for c in batch),
+                return_exceptions=True,
+            )
+            for outcome in outcomes:
+                if isinstance(outcome, BaseException):
+                    outcome = ToolResult(success=False, output=None, error=str(outcome))
+                results.append(outcome)
+            batch.clear()
+        
+        for call in tool_calls:
+            tool = self.tools.get(call["name"])
+            if tool is None or _concurrency_safe(tool, call["params"]):
+                batch.append(call)
+                continue
+            if batch:
+                await flush()
+            results.append(await self._execute_tool(call["name"], call["params"], context))
+        
+        if batch:
+            await flush()
+        
+        return results
     
     async def _execute_tool(
         self,
@@ -268,11 +426,31 @@ Respond in this JSON format:
                         error=f"Path not allowed: {path}",
                     )
         
+        accepted = self._tool_params.get(tool_name)
+        if accepted is not None:
+            params = {k: v for k, v in params.items() if k in accepted}
+        
+        # Reuse results of repeated read-only calls; anything that may
+        # modify state invalidates what has been seen so far.
+        cache = context._observation_cache
+        cache_key = None
+        if not _concurrency_safe(tool, params):
+            cache.clear()
+        elif getattr(tool, "deterministic", False):
+            cache_key = f"{tool_name}:{json.dumps(params, sort_keys=True, default=str)}"
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         try:
-            return await tool.execute(**params)
+            result = await tool.execute(**params)
         except Exception as e:
             return ToolResult(
                 success=False,
                 output=None,
                 error=str(e),
             )
+        
+        if cache_key is not None and result.success:
+            cache[cache_key] = result
+        return result
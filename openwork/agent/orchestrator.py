@@ -9,6 +9,8 @@ from enum import Enum
 from typing import Any
 from uuid import uuid4
 
+from openwork.runtime import enable_eager_tasks
+
 
 class TaskStatus(str, Enum):
     PENDING = "pending"
@@ -18,7 +20,7 @@ class TaskStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
-@dataclass
+@dataclass(slots=True)
 class Task:
     """A task to be executed by the agent."""
     id: str
@@ -40,6 +42,9 @@ class TaskOrchestrator:
     - Task queue management
     - Concurrent task execution
     - Task history tracking
+    
+    Each worker runs tasks on its own clone of the agent loop (when the
+    loop provides clone()), so one task's state never shows up in another's.
     """
     
     def __init__(self, max_concurrent_tasks: int = 1):
@@ -47,11 +52,13 @@ class TaskOrchestrator:
         self.tasks: dict[str, Task] = {}
         self.task_queue: asyncio.Queue[str] = asyncio.Queue()
         self._running = False
-        self._worker_task: asyncio.Task | None = None
+        self._stop_event = asyncio.Event()
+        self._workers: list[asyncio.Task] = []
+        self.in_flight = 0
         self._agent_loop = None
     
     def set_agent_loop(self, agent_loop: Any) -> None:
-        """Set the agent loop to use for task execution."""
+        """Set the agent loop to use for task execution; takes effect on start()."""
         self._agent_loop = agent_loop
     
     def create_task(self, description: str, allowed_paths: list[str]) -> Task:
@@ -70,37 +77,72 @@ class TaskOrchestrator:
         await self.task_queue.put(task.id)
     
     async def start(self) -> None:
-        """Start the task worker."""
+        """
+        Start max_concurrent_tasks workers sharing the task queue.
+        
+        The workers run on the caller's event loop; call
+        openwork.runtime.install_uvloop() before asyncio.run to use uvloop.
+        """
         if self._running:
             return
         self._running = True
-        self._worker_task = asyncio.create_task(self._worker())
+        self._stop_event.clear()
+        enable_eager_tasks()
+        self._workers = [
+            asyncio.create_task(self._worker(self._worker_loop(index)))
+            for index in range(max(1, self.max_concurrent_tasks))
+        ]
+    
+    def _worker_loop(self, index: int) -> Any:
+        """Get the agent loop for a worker: the first uses it, the rest a clone."""
+        agent_loop = self._agent_loop
+        if index and hasattr(agent_loop, "clone"):
+            return agent_loop.clone()
+        return agent_loop
     
-    async def stop(self) -> None:
-        """Stop the task worker."""
+    async def stop(self, grace: float = 0.0) -> None:
+        """
+        Stop all workers.
+        
+        In-flight tasks get up to grace seconds to finish; then the workers
+        are cancelled, their running tasks marked cancelled, and awaited.
+        """
         self._running = False
-        if self._worker_task:
-            self._worker_task.cancel()
-            try:
-                await self._worker_task
-            except asyncio.CancelledError:
-                pass
+        self._stop_event.set()
+        if grace > 0 and self._workers:
+            await asyncio.wait(self._workers, timeout=grace)
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
     
-    async def _worker(self) -> None:
-        """Worker that processes tasks from the queue."""
-        while self._running:
-            try:
-                task_id = await asyncio.wait_for(
-                    self.task_queue.get(),
-                    timeout=1.0
+    async def _worker(self, agent_loop: Any) -> None:
+        """Worker that processes tasks from the queue until stopped."""
+        stop_wait = asyncio.ensure_future(self._stop_event.wait())
+        get: asyncio.Future[str] | None = None
+        try:
+            while not self._stop_event.is_set():
+                get = asyncio.ensure_future(self.task_queue.get())
+                done, _ = await asyncio.wait(
+                    {get, stop_wait},
+                    return_when=asyncio.FIRST_COMPLETED,
                 )
-                await self._execute_task(task_id)
-            except asyncio.TimeoutError:
-                continue
-            except asyncio.CancelledError:
-                break
+                if get not in done:
+                    break
+                self.in_flight += 1
+                try:
+                    await self._execute_task(get.result(), agent_loop)
+                finally:
+                    self.in_flight -= 1
+                    self.task_queue.task_done()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            stop_wait.cancel()
+            if get is not None and not get.done():
+                get.cancel()
     
-    async def _execute_task(self, task_id: str) -> None:
+    async def _execute_task(self, task_id: str, agent_loop: Any) -> None:
         """Execute a single task."""
         task = self.tasks.get(task_id)
         if not task:
@@ -110,8 +152,8 @@ class TaskOrchestrator:
         task.started_at = datetime.now()
         
         try:
-            if self._agent_loop:
-                result = await self._agent_loop.run(
+            if agent_loop:
+                result = await agent_loop.run(
                     task.description,
                     task.allowed_paths,
                 )
@@ -122,6 +164,10 @@ class TaskOrchestrator:
             else:
                 task.status = TaskStatus.FAILED
                 task.error = "No agent loop configured"
+        except asyncio.CancelledError:
+            task.status = TaskStatus.CANCELLED
+            task.error = "Cancelled by stop()"
+            raise
         except Exception as e:
             task.status = TaskStatus.FAILED
             task.error = str(e)
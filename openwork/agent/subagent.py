@@ -10,16 +10,34 @@ Subagents allow:
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import itertools
+import json
+import os
+import secrets
+import time
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, TYPE_CHECKING
-from uuid import uuid4
+from typing import Any, AsyncIterator, TYPE_CHECKING
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 if TYPE_CHECKING:
     from openwork.agent.loop import AgentLoop, AgentResult
 
 
+def _dumps(obj: Any) -> str:
+    """Serialize to compact JSON text, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
 class SubagentStatus(str, Enum):
     PENDING = "pending"
     RUNNING = "running"
@@ -28,9 +46,14 @@ class SubagentStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
-@dataclass
+@dataclass(slots=True)
 class SubagentTask:
-    """A task for a subagent to execute."""
+    """
+    A task for a subagent to execute.
+    
+    Timestamps are stored as epoch seconds; use created_at_dt and
+    completed_at_dt for datetime values.
+    """
     id: str
     description: str
     allowed_paths: list[str]
@@ -38,11 +61,23 @@ class SubagentTask:
     status: SubagentStatus = SubagentStatus.PENDING
     result: Any = None
     error: str | None = None
-    created_at: datetime = field(default_factory=datetime.now)
-    completed_at: datetime | None = None
+    created_at: float = field(default_factory=time.time)
+    completed_at: float | None = None
+    
+    @property
+    def created_at_dt(self) -> datetime:
+        """Creation time as a local datetime."""
+        return datetime.fromtimestamp(self.created_at)
+    
+    @property
+    def completed_at_dt(self) -> datetime | None:
+        """Completion time as a local datetime, if completed."""
+        if self.completed_at is None:
+            return None
+        return datetime.fromtimestamp(self.completed_at)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SubagentResult:
     """Result from subagent execution."""
     task_id: str
@@ -60,6 +95,18 @@ class SubagentManager:
     - Spawn multiple subagents in parallel
     - Each subagent has isolated context
     - Results are summarized and returned to parent
+    
+    Long subagent outputs are summarized by the LLM; the full output is
+    kept under the task id and can be fetched with fetch_full(). Only
+    outputs that were summarized are kept, and at most max_stored_outputs
+    of them, least recently used evicted first.
+    
+    All subagents share the parent's system prompt, so they are given one
+    prompt cache key derived from it. With prime_prompt_cache enabled, a
+    one-token request writes the provider cache before a batch fans out.
+    
+    Task ids are a per-manager prefix (process id plus a random token
+    drawn once) followed by a counter, so no entropy is read per task.
     """
     
     def __init__(
@@ -67,12 +114,28 @@ class SubagentManager:
         agent_loop: AgentLoop,
         max_concurrent: int = 5,
         max_subagent_iterations: int = 10,
+        prime_prompt_cache: bool = False,
+        summary_threshold: int = 500,
+        max_stored_outputs: int = 64,
     ):
         self.agent_loop = agent_loop
         self.max_concurrent = max_concurrent
         self.max_subagent_iterations = max_subagent_iterations
+        self.prime_prompt_cache = prime_prompt_cache
+        self.summary_threshold = summary_threshold
+        self.max_stored_outputs = max_stored_outputs
+        self.full_outputs: OrderedDict[str, Any] = OrderedDict()
         self.tasks: dict[str, SubagentTask] = {}
+        self.inline_runs = 0
         self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._id_counter = itertools.count()
+        self._id_prefix = f"{os.getpid():x}-{secrets.token_hex(4)}-"
+        self._loop_pool: list[AgentLoop] = []
+        self._tools = tuple(agent_loop.tools.values())
+        self._system_prompt = agent_loop._system_prompt
+        self._system_hash = hashlib.blake2b(
+            self._system_prompt.encode("utf-8"), digest_size=16
+        ).hexdigest()
     
     def create_task(
         self,
@@ -82,7 +145,7 @@ class SubagentManager:
     ) -> SubagentTask:
         """Create a new subagent task."""
         task = SubagentTask(
-            id=str(uuid4()),
+            id=f"{self._id_prefix}{next(self._id_counter):x}",
             description=description,
             allowed_paths=allowed_paths,
             parent_context=parent_context or {},
@@ -91,73 +154,164 @@ class SubagentManager:
         return task
     
     async def execute_task(self, task: SubagentTask) -> SubagentResult:
-        """Execute a single subagent task."""
-        async with self._semaphore:
-            task.status = SubagentStatus.RUNNING
-            
+        """
+        Execute a single subagent task.
+        
+        Concurrency is bounded by execute_parallel, which acquires the
+        manager's semaphore before the task is created.
+        """
+        task.status = SubagentStatus.RUNNING
+        
+        try:
+            subagent = self._acquire_subagent()
             try:
-                from openwork.agent.loop import AgentLoop
-                
-                subagent = AgentLoop(
-                    llm=self.agent_loop.llm,
-                    tools=list(self.agent_loop.tools.values()),
-                    max_iterations=self.max_subagent_iterations,
-                    verbose=self.agent_loop.verbose,
-                )
-                
                 result = await subagent.run(
                     task=task.description,
                     allowed_paths=task.allowed_paths,
                 )
+            finally:
+                self._release_subagent(subagent)
+            
+            task.status = SubagentStatus.COMPLETED if result.success else SubagentStatus.FAILED
+            task.result = result
+            task.completed_at = time.time()
+            task.error = result.error
+            
+            return SubagentResult(
+                task_id=task.id,
+                success=result.success,
+                output=result.output,
+                summary=await self._summarize_result(task.id, result),
+                error=result.error,
+            )
+        
+        except Exception as e:
+            task.status = SubagentStatus.FAILED
+            task.error = str(e)
+            task.completed_at = time.time()
+            
+            return SubagentResult(
+                task_id=task.id,
+                success=False,
+                output=None,
+                summary=f"Subagent failed: {e}",
+                error=str(e),
+            )
+    
+    def _acquire_subagent(self) -> AgentLoop:
+        """Check out a pooled subagent loop, creating one if none are idle."""
+        if self._loop_pool:
+            return self._loop_pool.pop()
+        
+        from openwork.agent.loop import AgentLoop
+        
+        return AgentLoop(
+            llm=self.agent_loop.llm,
+            tools=self._tools,
+            max_iterations=self.max_subagent_iterations,
+            verbose=self.agent_loop.verbose,
+            prompt_cache_key=self._system_hash,
+        )
+    
+    def _release_subagent(self, subagent: AgentLoop) -> None:
+        """Return a subagent loop to the pool, keeping at most max_concurrent."""
+        subagent.reset_state()
+        if len(self._loop_pool) < self.max_concurrent:
+            self._loop_pool.append(subagent)
+    
+    async def iter_parallel(
+        self,
+        tasks: list[SubagentTask],
+    ) -> AsyncIterator[SubagentResult]:
+        """
+        Execute subagent tasks in parallel, yielding results as they finish.
+        
+        A semaphore slot is acquired before each asyncio.Task is created,
+        so at most max_concurrent tasks exist at once regardless of batch
+        size. Results arrive in completion order; closing the iterator
+        early cancels the tasks still running.
+        
+        A single task is awaited inline, without creating an asyncio.Task;
+        the result is the same as for a batch of one. These runs are
+        counted in inline_runs.
+        """
+        if len(tasks) == 1:
+            self.inline_runs += 1
+            async with self._semaphore:
+                result = await self._run_task(tasks[0])
+            yield result
+            return
+        
+        if self.prime_prompt_cache:
+            await self._prime_prompt_cache()
+        
+        remaining = deque(tasks)
+        pending: set[asyncio.Task] = set()
+        
+        def on_done(running_task: asyncio.Task) -> None:
+            self._semaphore.release()
+        
+        try:
+            while remaining or pending:
+                # Start as many tasks as there are free slots, waiting for
+                # one only when nothing of ours is running yet.
+                while remaining and (not pending or not self._semaphore.locked()):
+                    await self._semaphore.acquire()
+                    running_task = asyncio.create_task(self._run_task(remaining.popleft()))
+                    running_task.add_done_callback(on_done)
+                    pending.add(running_task)
                 
-                task.status = SubagentStatus.COMPLETED if result.success else SubagentStatus.FAILED
-                task.result = result
-                task.completed_at = datetime.now()
-                task.error = result.error
-                
-                return SubagentResult(
-                    task_id=task.id,
-                    success=result.success,
-                    output=result.output,
-                    summary=self._summarize_result(result),
-                    error=result.error,
-                )
-                
-            except Exception as e:
-                task.status = SubagentStatus.FAILED
-                task.error = str(e)
-                task.completed_at = datetime.now()
-                
-                return SubagentResult(
-                    task_id=task.id,
-                    success=False,
-                    output=None,
-                    summary=f"Subagent failed: {e}",
-                    error=str(e),
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
                 )
+                for running_task in done:
+                    yield running_task.result()
+        finally:
+            for running_task in pending:
+                running_task.cancel()
     
     async def execute_parallel(
         self,
         tasks: list[SubagentTask],
     ) -> list[SubagentResult]:
-        """Execute multiple subagent tasks in parallel."""
-        coroutines = [self.execute_task(task) for task in tasks]
-        results = await asyncio.gather(*coroutines, return_exceptions=True)
-        
-        final_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                final_results.append(SubagentResult(
-                    task_id=tasks[i].id,
-                    success=False,
-                    output=None,
-                    summary=f"Exception: {result}",
-                    error=str(result),
-                ))
-            else:
-                final_results.append(result)
+        """
+        Execute multiple subagent tasks in parallel.
         
-        return final_results
+        Collects iter_parallel() and returns results in input order.
+        """
+        positions = {task.id: index for index, task in enumerate(tasks)}
+        results: list[SubagentResult | None] = [None] * len(tasks)
+        async for result in self.iter_parallel(tasks):
+            results[positions[result.task_id]] = result
+        return results
+    
+    async def _run_task(self, task: SubagentTask) -> SubagentResult:
+        """Execute a task, turning unexpected exceptions into a failed result."""
+        try:
+            return await self.execute_task(task)
+        except Exception as e:
+            return SubagentResult(
+                task_id=task.id,
+                success=False,
+                output=None,
+                summary=f"Exception: {e}",
+                error=str(e),
+            )
+    
+    async def _prime_prompt_cache(self) -> None:
+        """Send the shared system prompt once so parallel subagents hit the cache."""
+        messages = [
+            {"role": "system", "content": self._system_prompt},
+            {"role": "user", "content": "Reply with OK."},
+        ]
+        try:
+            await self.agent_loop.llm.generate(
+                messages,
+                max_tokens=1,
+                prompt_cache_key=self._system_hash,
+            )
+        except Exception:
+            pass
     
     async def spawn_and_wait(
         self,
@@ -170,7 +324,7 @@ class SubagentManager:
         Args:
             subtasks: List of dicts with 'description' key
             allowed_paths: Paths subagents can access
-            
+        
         Returns:
             List of SubagentResults
         """
@@ -185,15 +339,44 @@ class SubagentManager:
         
         return await self.execute_parallel(tasks)
     
-    def _summarize_result(self, result: AgentResult) -> str:
-        """Create a brief summary of agent result."""
-        if result.success:
-            output = str(result.output)
-            if len(output) > 500:
-                output = output[:500] + "..."
-            return f"Completed: {output}"
-        else:
+    async def _summarize_result(self, task_id: str, result: AgentResult) -> str:
+        """
+        Create a brief summary of agent result.
+        
+        Outputs longer than summary_threshold are compressed by the LLM
+        and returned as a reference to the full output. If the LLM call
+        fails, the output is truncated instead.
+        """
+        if not result.success:
             return f"Failed: {result.error}"
+        
+        output = str(result.output)
+        if len(output) <= self.summary_threshold:
+            return f"Completed: {output}"
+        
+        self.full_outputs[task_id] = result.output
+        if len(self.full_outputs) > self.max_stored_outputs:
+            self.full_outputs.popitem(last=False)
+        
+        try:
+            summary = await self.agent_loop.llm.generate(
+                [{
+                    "role": "user",
+                    "content": f"Summarize in 2 sentences:\n{output[:4000]}",
+                }],
+                max_tokens=150,
+            )
+        except Exception:
+            summary = output[:self.summary_threshold] + "..."
+        
+        return f"Completed: [ref:{task_id}] {summary.strip()}"
+    
+    def fetch_full(self, task_id: str) -> Any:
+        """Get the full output of a summarized subagent task, or None."""
+        if task_id not in self.full_outputs:
+            return None
+        self.full_outputs.move_to_end(task_id)
+        return self.full_outputs[task_id]
     
     def get_task(self, task_id: str) -> SubagentTask | None:
         """Get a task by ID."""
@@ -217,6 +400,9 @@ class SubagentTool:
     Tool that allows the agent to spawn subagents.
     
     This enables the agent to delegate subtasks to parallel workers.
+    Summaries may reference full outputs as [ref:<task_id>], so register
+    it together with SubagentOutputTool; create_subagent_tools() builds
+    both.
     """
     
     name = "spawn_subagent"
@@ -267,31 +453,44 @@ class SubagentTool:
                 error="Maximum 10 subtasks allowed"
             )
         
-        results = await self.manager.spawn_and_wait(
-            subtasks=subtasks,
-            allowed_paths=self.allowed_paths,
-        )
+        tasks = [
+            self.manager.create_task(
+                description=st["description"],
+                allowed_paths=self.allowed_paths,
+                parent_context=st.get("context", {}),
+            )
+            for st in subtasks
+        ]
+        positions = {task.id: index for index, task in enumerate(tasks)}
         
-        success_count = sum(1 for r in results if r.success)
+        # Pack each row into its slot as the subagent finishes
+        rows: list[dict[str, Any] | None] = [None] * len(tasks)
+        success_count = 0
+        async for r in self.manager.iter_parallel(tasks):
+            success_count += r.success
+            rows[positions[r.task_id]] = {
+                "task_id": r.task_id,
+                "success": r.success,
+                "summary": r.summary,
+            }
         
+        # Serialized once here; the agent passes the JSON to the LLM as is
         return ToolResult(
             success=success_count > 0,
-            output={
-                "total": len(results),
+            output=_dumps({
+                "total": len(tasks),
                 "successful": success_count,
-                "failed": len(results) - success_count,
-                "results": [
-                    {
-                        "task_id": r.task_id,
-                        "success": r.success,
-                        "summary": r.summary,
-                    }
-                    for r in results
-                ]
-            },
-            metadata={"subtask_count": len(subtasks)}
+                "failed": len(tasks) - success_count,
+                "results": rows,
+            }),
+            metadata={"subtask_count": len(subtasks), "successful": success_count},
+            content_type="application/json",
         )
     
+    def is_concurrency_safe(self, **kwargs: Any) -> bool:
+        """Subagents may modify files, so always run serially."""
+        return False
+    
     def to_schema(self) -> dict[str, Any]:
         """Convert to LLM function calling schema."""
         return {
@@ -302,3 +501,79 @@ class SubagentTool:
                 "parameters": self.parameters,
             }
         }
+
+
+class SubagentOutputTool:
+    """
+    Tool that returns the full output of a finished subagent.
+    
+    Subagent summaries reference long outputs as [ref:<task_id>]; this
+    lets the agent pull the full text only when it needs it.
+    """
+    
+    name = "fetch_subagent_output"
+    description = "Fetch the full output of a subagent task referenced as [ref:<task_id>] in a summary."
+    requires_path_check = False
+    parameters = {
+        "type": "object",
+        "properties": {
+            "task_id": {
+                "type": "string",
+                "description": "ID of the subagent task"
+            }
+        },
+        "required": ["task_id"]
+    }
+    
+    def __init__(self, manager: SubagentManager):
+        self.manager = manager
+    
+    async def execute(self, **kwargs: Any) -> Any:
+        """Return the stored full output."""
+        from openwork.tools.base import ToolResult
+        
+        task_id = kwargs.get("task_id", "")
+        if task_id not in self.manager.full_outputs:
+            return ToolResult(
+                success=False,
+                output=None,
+                error=f"No output stored for task: {task_id}"
+            )
+        
+        return ToolResult(
+            success=True,
+            output=self.manager.fetch_full(task_id),
+        )
+    
+    def is_concurrency_safe(self, **kwargs: Any) -> bool:
+        """Reading stored output never modifies state."""
+        return True
+    
+    def to_schema(self) -> dict[str, Any]:
+        """Convert to LLM function calling schema."""
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.description,
+                "parameters": self.parameters,
+            }
+        }
+
+
+def create_subagent_tools(
+    manager: SubagentManager,
+    allowed_paths: list[str],
+) -> list[SubagentTool | SubagentOutputTool]:
+    """
+    Create the subagent tools to register with a parent agent.
+    
+    Args:
+        manager: Manager running the subagents
+        allowed_paths: Paths the subagents may access
+    
+    Returns:
+        The spawning tool and the tool that resolves its [ref:<task_id>]
+        references
+    """
+    return [SubagentTool(manager, allowed_paths), SubagentOutputTool(manager)]
@@ -50,8 +50,9 @@ def run(
     ),
 ):
     """Run an agent task."""
-    from openwork.llm.provider import LLMProvider
+    from openwork.llm.provider import LLMProvider, close_http_pool
     from openwork.agent.loop import AgentLoop
+    from openwork.runtime import enable_eager_tasks
     from openwork.tools.file_tool import FileTool
     from openwork.tools.bash_tool import BashTool
     from openwork.tools.search_tool import SearchTool
@@ -82,7 +83,14 @@ def run(
     agent = AgentLoop(llm=llm, tools=tools, verbose=verbose)
     
     async def execute():
-        return await agent.run(task, validated_paths)
+        # asyncio.run gives this command its own loop, so eager tasks
+        # affect nothing else
+        enable_eager_tasks()
+        try:
+            return await agent.run(task, validated_paths)
+        finally:
+            await close_http_pool()
+            await asyncio.gather(*(tool.close() for tool in tools))
     
     with console.status("[bold green]Working on task..."):
         result = asyncio.run(execute())
@@ -129,6 +137,8 @@ def version():
 
 def main():
     """Main entry point."""
+    from openwork.runtime import install_uvloop
+    install_uvloop()
     app()
 
 
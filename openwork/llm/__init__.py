@@ -1,6 +1,14 @@
 """LLM module - Multi-model support through litellm."""
 
 from openwork.llm.base import BaseLLM
+from openwork.llm.cache import CacheBackend, LLMCache, MemoryCacheBackend
 from openwork.llm.provider import LLMProvider, create_llm
 
-__all__ = ["BaseLLM", "LLMProvider", "create_llm"]
+__all__ = [
+    "BaseLLM",
+    "CacheBackend",
+    "LLMCache",
+    "MemoryCacheBackend",
+    "LLMProvider",
+    "create_llm",
+]
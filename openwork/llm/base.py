@@ -7,7 +7,7 @@ from dataclasses import dataclass
 from typing import Any
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LLMResponse:
     """Response from LLM."""
     content: str
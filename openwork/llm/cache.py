@@ -0,0 +1,153 @@
+"""Response cache for LLM calls."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Protocol
+
+
+EmbedFunction = Callable[[str], Awaitable[list[float]]]
+
+
+class CacheBackend(Protocol):
+    """Storage backend for cached LLM responses."""
+    
+    async def get(self, key: str) -> str | None:
+        """Return the cached value for key, or None on miss."""
+        ...
+    
+    async def set(self, key: str, value: str) -> None:
+        """Store a value under key."""
+        ...
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache backend."""
+    
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._data: OrderedDict[str, str] = OrderedDict()
+    
+    async def get(self, key: str) -> str | None:
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+    
+    async def set(self, key: str, value: str) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class LLMCache:
+    """
+    Cache for LLM responses keyed on the full request.
+    
+    Exact lookups use a SHA256 of (model, messages, tools). When an
+    embedding function is supplied, a miss falls back to comparing the
+    embedding of the last message against previously stored requests and
+    reuses a response whose cosine similarity exceeds the threshold.
+    """
+    
+    def __init__(
+        self,
+        backend: CacheBackend | None = None,
+        embed: EmbedFunction | None = None,
+        similarity_threshold: float = 0.92,
+        max_semantic_entries: int = 256,
+    ):
+        self.backend = backend or MemoryCacheBackend()
+        self.embed = embed
+        self.similarity_threshold = similarity_threshold
+        self.max_semantic_entries = max_semantic_entries
+        self.stats = {"hits": 0, "misses": 0}
+        self._semantic_index: list[tuple[str, str, list[float]]] = []
+    
+    @staticmethod
+    def cache_key(
+        model: str,
+        messages: list[dict[str, Any]],
+        tools: list[str] | None = None,
+    ) -> str:
+        """Compute a stable key for an LLM request."""
+        payload = json.dumps(
+            {"model": model, "messages": messages, "tools": tools or []},
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    async def get(
+        self,
+        key: str,
+        messages: list[dict[str, Any]] | None = None,
+    ) -> str | None:
+        """Look up a cached response, falling back to semantic search."""
+        value = await self.backend.get(key)
+        if value is None and self.embed and messages:
+            value = await self._semantic_get(messages)
+        
+        if value is None:
+            self.stats["misses"] += 1
+        else:
+            self.stats["hits"] += 1
+        return value
+    
+    async def set(
+        self,
+        key: str,
+        value: str,
+        messages: list[dict[str, Any]] | None = None,
+    ) -> None:
+        """Store a response, indexing it for semantic lookup if enabled."""
+        await self.backend.set(key, value)
+        if self.embed and messages:
+            prefix = self._prefix_key(messages)
+            vector = await self.embed(messages[-1].get("content", ""))
+            self._semantic_index.append((prefix, key, vector))
+            if len(self._semantic_index) > self.max_semantic_entries:
+                self._semantic_index.pop(0)
+    
+    async def _semantic_get(self, messages: list[dict[str, Any]]) -> str | None:
+        """Find a stored response for a near-duplicate final message."""
+        if not self._semantic_index:
+            return None
+        
+        prefix = self._prefix_key(messages)
+        vector = await self.embed(messages[-1].get("content", ""))
+        
+        best_key = None
+        best_score = self.similarity_threshold
+        for stored_prefix, stored_key, stored_vector in self._semantic_index:
+            if stored_prefix != prefix:
+                continue
+            score = _cosine(vector, stored_vector)
+            if score > best_score:
+                best_key, best_score = stored_key, score
+        
+        if best_key is None:
+            return None
+        return await self.backend.get(best_key)
+    
+    @staticmethod
+    def _prefix_key(messages: list[dict[str, Any]]) -> str:
+        """Key for everything except the final message."""
+        return hashlib.sha256(
+            json.dumps(messages[:-1], sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+
+def _cosine(a: list[float], b: list[float]) -> float:
+    """Cosine similarity of two vectors."""
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
@@ -2,11 +2,97 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import importlib.util
+import json
 import os
-from typing import Any
+import weakref
+from typing import Any, Callable
+
+import httpx
 
 from openwork.llm.base import BaseLLM
 
+try:
+    import orjson as _json
+except ImportError:
+    _json = json
+
+# HTTP/2 needs the optional h2 package; fall back to HTTP/1.1 keep-alive.
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Model names that go to OpenAI and accept prompt_cache_key
+_OPENAI_MODEL_PREFIXES = ("gpt-", "chatgpt-", "o1", "o3", "o4", "openai/")
+
+
+class _LoopPools(httpx.AsyncBaseTransport):
+    """
+    Transport keeping a separate connection pool for each event loop.
+    
+    Connections belong to the loop that opened them, so the one shared
+    client can serve the server, the CLI and every Streamlit session
+    loop. A loop's pool is dropped when the loop is garbage collected.
+    """
+    
+    def __init__(self, factory: Callable[[], httpx.AsyncBaseTransport]):
+        self._factory = factory
+        self._pools: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, httpx.AsyncBaseTransport
+        ] = weakref.WeakKeyDictionary()
+    
+    def _pool(self) -> httpx.AsyncBaseTransport:
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is None:
+            pool = self._pools[loop] = self._factory()
+        return pool
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._pool().handle_async_request(request)
+    
+    async def aclose(self) -> None:
+        """Close the running loop's pool; the others are left open."""
+        pool = self._pools.pop(asyncio.get_running_loop(), None)
+        if pool is not None:
+            await pool.aclose()
+
+
+_http_pools = _LoopPools(lambda: httpx.AsyncHTTPTransport(
+    http2=_HTTP2_AVAILABLE,
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+))
+_http_client: httpx.AsyncClient | None = None
+
+
+def _install_http_client(litellm: Any) -> None:
+    """
+    Give litellm the process-wide pooled client as its async session.
+    
+    The session is set once and never swapped per provider or call, and
+    a session set by someone else is left alone.
+    """
+    global _http_client
+    if litellm.aclient_session is not None:
+        return
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(transport=_http_pools)
+    litellm.aclient_session = _http_client
+
+
+async def close_http_pool() -> None:
+    """Close the shared client's connections opened on the running loop."""
+    await _http_pools.aclose()
+
+
+def _load_litellm() -> Any:
+    """Import litellm, or return None if it is not installed."""
+    try:
+        import litellm
+    except ImportError:
+        return None
+    return litellm
+
 
 class LLMProvider(BaseLLM):
     """
@@ -18,6 +104,17 @@ class LLMProvider(BaseLLM):
     - Google (gemini-pro, gemini-pro-vision)
     - Local models via Ollama (ollama/llama2, ollama/mistral)
     - And many more through litellm
+    
+    Requests from every provider share one process-wide pooled
+    httpx.AsyncClient, handed to litellm as its async client session.
+    Call close_http_pool() before the event loop shuts down.
+    
+    litellm is imported once when the provider is created rather than on
+    every call; a missing install is reported when a request is made.
+    
+    The fixed completion arguments (model, temperature, max_tokens,
+    api_base) and the prompt caching style are resolved at construction,
+    so changing those attributes afterwards has no effect.
     """
     
     MODEL_ALIASES = {
@@ -40,12 +137,28 @@ class LLMProvider(BaseLLM):
         api_base: str | None = None,
         temperature: float = 0.7,
         max_tokens: int = 4096,
+        prompt_caching: bool = True,
     ):
         self.model = self.MODEL_ALIASES.get(model, model)
         self.api_key = api_key
         self.api_base = api_base
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.prompt_caching = prompt_caching
+        self._litellm = _load_litellm()
+        self._base_kwargs = {
+            "model": self.model,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "api_base": api_base,
+        }
+        model_lower = self.model.lower()
+        if "claude" in model_lower or "anthropic" in model_lower:
+            self._cache_style = "anthropic"
+        elif model_lower.startswith(_OPENAI_MODEL_PREFIXES):
+            self._cache_style = "openai"
+        else:
+            self._cache_style = None
         
         if api_key:
             if "claude" in model.lower() or "anthropic" in model.lower():
@@ -62,14 +175,15 @@ class LLMProvider(BaseLLM):
     ) -> str:
         """Generate response using litellm."""
         try:
-            import litellm
-            
+            litellm = self._require_litellm()
+            _install_http_client(litellm)
+            messages, cache_kwargs = self._apply_prompt_caching(
+                messages, kwargs.get("prompt_cache_key")
+            )
             response = await litellm.acompletion(
-                model=self.model,
+                **self._request_kwargs(kwargs),
                 messages=messages,
-                temperature=kwargs.get("temperature", self.temperature),
-                max_tokens=kwargs.get("max_tokens", self.max_tokens),
-                api_base=self.api_base,
+                **cache_kwargs,
             )
             
             return response.choices[0].message.content
@@ -87,16 +201,17 @@ class LLMProvider(BaseLLM):
     ) -> dict[str, Any]:
         """Generate response with tool calling support."""
         try:
-            import litellm
-            
+            litellm = self._require_litellm()
+            _install_http_client(litellm)
+            messages, cache_kwargs = self._apply_prompt_caching(
+                messages, kwargs.get("prompt_cache_key")
+            )
             response = await litellm.acompletion(
-                model=self.model,
+                **self._request_kwargs(kwargs),
                 messages=messages,
                 tools=tools,
                 tool_choice="auto",
-                temperature=kwargs.get("temperature", self.temperature),
-                max_tokens=kwargs.get("max_tokens", self.max_tokens),
-                api_base=self.api_base,
+                **cache_kwargs,
             )
             
             message = response.choices[0].message
@@ -111,6 +226,7 @@ class LLMProvider(BaseLLM):
                         "id": tc.id,
                         "name": tc.function.name,
                         "arguments": tc.function.arguments,
+                        "params": self.parse_arguments(tc.function.arguments),
                     }
                     for tc in message.tool_calls
                 ]
@@ -122,6 +238,89 @@ class LLMProvider(BaseLLM):
         except Exception as e:
             raise RuntimeError(f"LLM generation failed: {e}")
 
+    @staticmethod
+    def parse_arguments(arguments: str | dict[str, Any] | None) -> dict[str, Any]:
+        """
+        Decode tool-call arguments from a JSON string.
+        
+        Uses orjson when installed. Malformed or non-object arguments
+        decode to an empty dict.
+        """
+        if not arguments:
+            return {}
+        if isinstance(arguments, dict):
+            return arguments
+        try:
+            params = _json.loads(arguments)
+        except ValueError:
+            return {}
+        return params if isinstance(params, dict) else {}
+    
+    def _request_kwargs(self, overrides: dict[str, Any]) -> dict[str, Any]:
+        """Completion arguments, copying the base set only when overridden."""
+        if "temperature" not in overrides and "max_tokens" not in overrides:
+            return self._base_kwargs
+        request = dict(self._base_kwargs)
+        if "temperature" in overrides:
+            request["temperature"] = overrides["temperature"]
+        if "max_tokens" in overrides:
+            request["max_tokens"] = overrides["max_tokens"]
+        return request
+    
+    def _require_litellm(self) -> Any:
+        """Get the litellm module, raising ImportError if it is missing."""
+        if self._litellm is None:
+            raise ImportError("litellm is not installed")
+        return self._litellm
+    
+    def _apply_prompt_caching(
+        self,
+        messages: list[dict[str, Any]],
+        cache_key: str | None = None,
+    ) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+        """
+        Mark the leading system messages as a cacheable prompt prefix.
+        
+        Anthropic models get a cache_control breakpoint on the last prefix
+        message; OpenAI models get a prompt_cache_key so requests sharing
+        the prefix are routed to the same cache. The key is cache_key when
+        given, otherwise derived from the prefix.
+        
+        Returns:
+            Tuple of (messages, extra completion kwargs)
+        """
+        if not self.prompt_caching:
+            return messages, {}
+        
+        prefix_len = 0
+        while prefix_len < len(messages) and messages[prefix_len]["role"] == "system":
+            prefix_len += 1
+        if prefix_len == 0:
+            return messages, {}
+        
+        style = self._cache_style
+        if style == "anthropic":
+            last = messages[prefix_len - 1]
+            marked = {
+                "role": last["role"],
+                "content": [{
+                    "type": "text",
+                    "text": last["content"],
+                    "cache_control": {"type": "ephemeral"},
+                }],
+            }
+            return [*messages[:prefix_len - 1], marked, *messages[prefix_len:]], {}
+        
+        if style == "openai":
+            if cache_key is None:
+                digest = hashlib.sha256()
+                for message in messages[:prefix_len]:
+                    digest.update(message["content"].encode("utf-8"))
+                cache_key = digest.hexdigest()[:32]
+            return messages, {"prompt_cache_key": cache_key}
+        
+        return messages, {}
+
 
 def create_llm(
     model: str = "gpt-4",
@@ -0,0 +1,49 @@
+"""Event loop runtime helpers."""
+
+from __future__ import annotations
+
+import asyncio
+
+
+def install_uvloop() -> bool:
+    """
+    Use uvloop as the asyncio event loop policy if it is installed.
+    
+    Must be called before the event loop is created (i.e. before
+    asyncio.run). uvloop is optional; without it the default loop is kept.
+    
+    Returns:
+        True if uvloop was installed
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+def enable_eager_tasks(loop: asyncio.AbstractEventLoop | None = None) -> bool:
+    """
+    Install asyncio.eager_task_factory on the running loop (Python 3.12+).
+    
+    Eager tasks start executing immediately and skip the scheduler round
+    trip when they finish without suspending. A loop that already has a
+    custom task factory is left untouched. The factory stays installed and
+    changes scheduling for every task on the loop, so only call this on a
+    loop the caller owns.
+    
+    Returns:
+        True if eager tasks are enabled on the loop
+    """
+    factory = getattr(asyncio, "eager_task_factory", None)
+    if factory is None:
+        return False
+    
+    loop = loop or asyncio.get_running_loop()
+    current = loop.get_task_factory()
+    if current is None:
+        loop.set_task_factory(factory)
+        return True
+    return current is factory
@@ -3,26 +3,35 @@
 from __future__ import annotations
 
 import asyncio
+import os
 import shutil
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
+from uuid import uuid4
 
+import httpx
 
-@dataclass
+
+_DEFAULT_ALLOWED_EXTS = frozenset({
+    ".txt", ".md", ".json", ".yaml", ".yml",
+    ".py", ".js", ".ts", ".html", ".css",
+    ".csv", ".xml", ".log", ".sh", ".bat",
+})
+_DEFAULT_BLOCKED_EXTS = frozenset({
+    ".exe", ".dll", ".so", ".dylib",
+    ".bin", ".dat",
+})
+
+
+@dataclass(slots=True)
 class SandboxConfig:
     """Configuration for sandbox environment."""
     allowed_paths: list[Path] = field(default_factory=list)
     max_file_size: int = 100 * 1024 * 1024  # 100MB
-    allowed_extensions: set[str] = field(default_factory=lambda: {
-        ".txt", ".md", ".json", ".yaml", ".yml",
-        ".py", ".js", ".ts", ".html", ".css",
-        ".csv", ".xml", ".log", ".sh", ".bat",
-    })
-    blocked_extensions: set[str] = field(default_factory=lambda: {
-        ".exe", ".dll", ".so", ".dylib",
-        ".bin", ".dat",
-    })
+    allowed_extensions: frozenset[str] = _DEFAULT_ALLOWED_EXTS
+    blocked_extensions: frozenset[str] = _DEFAULT_BLOCKED_EXTS
     use_docker: bool = False
     docker_image: str = "python:3.11-slim"
     docker_timeout: int = 300
@@ -36,46 +45,85 @@ class SandboxManager:
     - Path validation and restriction
     - File size limits
     - Extension filtering
+    
+    Allowed paths are indexed as sorted, separator-terminated strings so
+    a check is a binary search rather than a scan of every root. The
+    index is rebuilt by add_allowed_path/remove_allowed_path. Only the
+    roots are resolved ahead of time; every checked path is resolved
+    fresh, so a symlink retargeted after an earlier check is caught.
+    
+    Docker commands run in a persistent DockerSandbox container; call
+    close() to remove it.
     """
     
     def __init__(self, config: SandboxConfig | None = None):
         self.config = config or SandboxConfig()
         self._initialized = False
+        self._docker: DockerSandbox | None = None
+        self._rebuild_path_index()
     
     def add_allowed_path(self, path: str | Path) -> None:
         """Add a path to the allowed list."""
         path = Path(path).resolve()
         if path not in self.config.allowed_paths:
             self.config.allowed_paths.append(path)
+            self._rebuild_path_index()
     
     def remove_allowed_path(self, path: str | Path) -> None:
         """Remove a path from the allowed list."""
         path = Path(path).resolve()
         if path in self.config.allowed_paths:
             self.config.allowed_paths.remove(path)
+            self._rebuild_path_index()
+    
+    def _rebuild_path_index(self) -> None:
+        """Rebuild the sorted prefix index over allowed paths."""
+        prefixes = sorted({
+            _dir_prefix(str(Path(p).resolve())) for p in self.config.allowed_paths
+        })
+        self._allowed_sorted = prefixes
+        # Roots nested inside another root are redundant for containment
+        # checks, and dropping them keeps the predecessor lookup exact.
+        self._allowed_roots: list[str] = []
+        for prefix in prefixes:
+            if not self._allowed_roots or not prefix.startswith(self._allowed_roots[-1]):
+                self._allowed_roots.append(prefix)
     
     def is_path_allowed(self, path: str | Path) -> bool:
-        """Check if a path is within allowed paths."""
-        path = Path(path).resolve()
+        """
+        Check if a path is within allowed paths.
         
-        if not self.config.allowed_paths:
+        A path is allowed if it is an allowed path, lies inside one, or is
+        an ancestor of one.
+        """
+        return self._is_resolved_allowed(Path(path).resolve())
+    
+    def _is_resolved_allowed(self, path: Path) -> bool:
+        """Check an already resolved path against the allowed roots."""
+        if not self._allowed_sorted:
             return False
         
-        return any(
-            path == allowed or allowed in path.parents or path in allowed.parents
-            for allowed in self.config.allowed_paths
-        )
+        prefix = _dir_prefix(str(path))
+        
+        roots = self._allowed_roots
+        idx = bisect_right(roots, prefix)
+        if idx and prefix.startswith(roots[idx - 1]):
+            return True
+        
+        allowed = self._allowed_sorted
+        idx = bisect_left(allowed, prefix)
+        return idx < len(allowed) and allowed[idx].startswith(prefix)
     
     def is_extension_allowed(self, path: str | Path) -> bool:
         """Check if file extension is allowed."""
-        path = Path(path)
-        ext = path.suffix.lower()
+        ext = _suffix(path)
+        config = self.config
         
-        if ext in self.config.blocked_extensions:
+        if ext in config.blocked_extensions:
             return False
         
-        if self.config.allowed_extensions:
-            return ext in self.config.allowed_extensions or ext == ""
+        if config.allowed_extensions:
+            return ext in config.allowed_extensions or ext == ""
         
         return True
     
@@ -88,7 +136,7 @@ class SandboxManager:
         """
         path = Path(path).resolve()
         
-        if not self.is_path_allowed(path):
+        if not self._is_resolved_allowed(path):
             return False, f"Path not in allowed directories: {path}"
         
         if path.exists() and path.is_file():
@@ -100,6 +148,65 @@ class SandboxManager:
         
         return True, None
     
+    def validate_paths_batch(
+        self,
+        paths: list[str | Path],
+    ) -> list[tuple[bool, str | None]]:
+        """
+        Validate many paths at once.
+        
+        Gives the same results as validate_path for each path, but paths
+        sharing a parent directory are looked up with a single os.scandir
+        of that directory instead of separate exists/is_file/stat calls.
+        
+        Returns:
+            List of (is_valid, error_message), in input order
+        """
+        resolved = [Path(p).resolve() for p in paths]
+        allowed = [self._is_resolved_allowed(p) for p in resolved]
+        
+        by_parent: dict[str, list[Path]] = {}
+        for path, ok in zip(resolved, allowed):
+            if ok:
+                by_parent.setdefault(str(path.parent), []).append(path)
+        
+        # Directory entries per parent; single lookups skip the listing
+        entries: dict[str, dict[str, os.DirEntry | Path]] = {}
+        for parent, members in by_parent.items():
+            if len(members) == 1:
+                entries[parent] = {members[0].name: members[0]}
+                continue
+            try:
+                with os.scandir(parent) as it:
+                    entries[parent] = {entry.name: entry for entry in it}
+            except OSError:
+                entries[parent] = {}
+        
+        config = self.config
+        results: list[tuple[bool, str | None]] = []
+        for path, ok in zip(resolved, allowed):
+            if not ok:
+                results.append((False, f"Path not in allowed directories: {path}"))
+                continue
+            
+            entry = entries[str(path.parent)].get(path.name)
+            try:
+                is_file = entry is not None and entry.is_file()
+            except OSError:
+                is_file = False
+            if is_file:
+                if not self.is_extension_allowed(path.name):
+                    results.append((False, f"File extension not allowed: {path.suffix}"))
+                    continue
+                size = entry.stat().st_size
+                if size > config.max_file_size:
+                    results.append((False, f"File exceeds size limit: {size} bytes"))
+                    continue
+            
+            results.append((True, None))
+        
+        return results
+    
     def get_status(self) -> dict[str, Any]:
         """Get sandbox status information."""
         return {
@@ -135,49 +242,81 @@ class SandboxManager:
         if not self._check_docker_available():
             return False, "", "Docker is not available"
         
-        timeout = timeout or self.config.docker_timeout
-        
-        volume_mounts = []
-        for path in self.config.allowed_paths:
-            mount_path = f"/workspace/{path.name}"
-            volume_mounts.extend(["-v", f"{path}:{mount_path}:rw"])
-        
-        docker_cmd = [
-            "docker", "run",
-            "--rm",
-            "--network", "none",
-            "--memory", "512m",
-            "--cpus", "1",
-            *volume_mounts,
-            "-w", working_dir or "/workspace",
-            self.config.docker_image,
-            "sh", "-c", command,
-        ]
+        if self._docker is None:
+            self._docker = DockerSandbox(image=self.config.docker_image)
         
-        try:
-            process = await asyncio.create_subprocess_exec(
-                *docker_cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            
-            try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
-                    timeout=timeout
-                )
-            except asyncio.TimeoutError:
-                process.kill()
-                return False, "", f"Docker execution timed out after {timeout}s"
-            
-            return (
-                process.returncode == 0,
-                stdout.decode("utf-8", errors="replace"),
-                stderr.decode("utf-8", errors="replace"),
-            )
-            
-        except Exception as e:
-            return False, "", str(e)
+        volumes = {
+            str(path): f"/workspace/{path.name}" for path in self.config.allowed_paths
+        }
+        return await self._docker.execute(
+            command,
+            language="bash",
+            timeout=timeout or self.config.docker_timeout,
+            volumes=volumes,
+            working_dir=working_dir or "/workspace",
+        )
+    
+    async def close(self) -> None:
+        """Remove any Docker containers started by run_in_docker."""
+        if self._docker is not None:
+            await self._docker.close()
+
+
+async def _run_process(args: list[str], timeout: float) -> tuple[int, bytes, bytes]:
+    """
+    Run a process and collect its output.
+    
+    Raises:
+        asyncio.TimeoutError: If the process outlives timeout; it is killed.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    
+    try:
+        stdout, stderr = await asyncio.wait_for(
+            process.communicate(),
+            timeout=timeout
+        )
+    except asyncio.TimeoutError:
+        process.kill()
+        raise
+    
+    return process.returncode, stdout, stderr
+
+
+def _demux_stream(data: bytes) -> tuple[bytes, bytes]:
+    """
+    Split a multiplexed Docker attach stream into stdout and stderr.
+    
+    Each frame is an 8-byte header (stream type, 3 padding bytes, 4-byte
+    big-endian length) followed by the payload.
+    """
+    view = memoryview(data)
+    stdout = bytearray()
+    stderr = bytearray()
+    offset = 0
+    while offset + 8 <= len(view):
+        stream = view[offset]
+        size = int.from_bytes(view[offset + 4:offset + 8], "big")
+        payload = view[offset + 8:offset + 8 + size]
+        (stderr if stream == 2 else stdout).extend(payload)
+        offset += 8 + size
+    return bytes(stdout), bytes(stderr)
+
+
+def _suffix(path: str | Path) -> str:
+    """Lowercased file extension, matching Path.suffix without building a Path."""
+    name = os.path.basename(path)
+    stem, dot, ext = name.rpartition(".")
+    return "." + ext.lower() if stem and ext else ""
+
+
+def _dir_prefix(path: str) -> str:
+    """Terminate a resolved path with a separator for prefix matching."""
+    return path if path.endswith(os.sep) else path + os.sep
 
 
 class DockerSandbox:
@@ -188,6 +327,14 @@ class DockerSandbox:
     - Network isolation
     - Resource limits (CPU, memory)
     - Volume mounting for allowed paths only
+    
+    A long-lived container is started per set of volume mounts on first
+    use and commands run in it with docker exec, so only the first call
+    pays container startup. Call close() to remove the containers.
+    
+    Execs go through the Docker Engine API on docker_socket when it is
+    reachable, avoiding a docker CLI process per command; otherwise they
+    fall back to the CLI.
     """
     
     def __init__(
@@ -196,12 +343,17 @@ class DockerSandbox:
         memory_limit: str = "512m",
         cpu_limit: str = "1",
         network: str = "none",
+        docker_socket: str = "/var/run/docker.sock",
     ):
         self.image = image
         self.memory_limit = memory_limit
         self.cpu_limit = cpu_limit
         self.network = network
-        self._container_id: str | None = None
+        self.docker_socket = docker_socket
+        self._containers: dict[tuple[tuple[str, str], ...], str] = {}
+        self._lock = asyncio.Lock()
+        self._api: httpx.AsyncClient | None = None
+        self._use_api = os.path.exists(docker_socket)
     
     @property
     def is_available(self) -> bool:
@@ -214,6 +366,7 @@ class DockerSandbox:
         language: str = "python",
         timeout: int = 30,
         volumes: dict[str, str] | None = None,
+        working_dir: str | None = None,
     ) -> tuple[bool, str, str]:
         """
         Execute code in a Docker container.
@@ -223,6 +376,7 @@ class DockerSandbox:
             language: Programming language (python, bash)
             timeout: Execution timeout
             volumes: Volume mappings {host_path: container_path}
+            working_dir: Working directory inside container
             
         Returns:
             Tuple of (success, stdout, stderr)
@@ -237,41 +391,135 @@ class DockerSandbox:
         else:
             return False, "", f"Unsupported language: {language}"
         
-        docker_cmd = [
-            "docker", "run",
-            "--rm",
-            "--network", self.network,
-            "--memory", self.memory_limit,
-            "--cpus", self.cpu_limit,
-        ]
-        
-        if volumes:
-            for host, container in volumes.items():
-                docker_cmd.extend(["-v", f"{host}:{container}:rw"])
-        
-        docker_cmd.extend([self.image, *cmd])
+        mounts = tuple(sorted((volumes or {}).items()))
         
         try:
-            process = await asyncio.create_subprocess_exec(
-                *docker_cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
+            container_id = await self._get_container(mounts)
             
             try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
-                    timeout=timeout
+                returncode, stdout, stderr = await self._exec(
+                    container_id, cmd, working_dir, timeout
                 )
             except asyncio.TimeoutError:
-                process.kill()
+                # The command keeps running inside the container; discard it
+                await self._remove_container(mounts)
                 return False, "", f"Execution timed out after {timeout}s"
             
             return (
-                process.returncode == 0,
+                returncode == 0,
                 stdout.decode("utf-8", errors="replace"),
                 stderr.decode("utf-8", errors="replace"),
             )
             
         except Exception as e:
             return False, "", str(e)
+    
+    async def _exec(
+        self,
+        container_id: str,
+        cmd: list[str],
+        working_dir: str | None,
+        timeout: float,
+    ) -> tuple[int, bytes, bytes]:
+        """Run a command in a container via the Engine API or the CLI."""
+        if self._use_api:
+            try:
+                return await asyncio.wait_for(
+                    self._exec_api(container_id, cmd, working_dir),
+                    timeout=timeout,
+                )
+            except httpx.ConnectError:
+                # Socket exists but is not usable (e.g. permissions)
+                self._use_api = False
+        
+        docker_cmd = ["docker", "exec"]
+        if working_dir:
+            docker_cmd.extend(["-w", working_dir])
+        docker_cmd.extend([container_id, *cmd])
+        return await _run_process(docker_cmd, timeout)
+    
+    async def _exec_api(
+        self,
+        container_id: str,
+        cmd: list[str],
+        working_dir: str | None,
+    ) -> tuple[int, bytes, bytes]:
+        """Create, start and inspect an exec instance over the Docker socket."""
+        if self._api is None:
+            self._api = httpx.AsyncClient(
+                transport=httpx.AsyncHTTPTransport(uds=self.docker_socket),
+                base_url="http://docker",
+                timeout=None,
+            )
+        api = self._api
+        
+        config: dict[str, Any] = {
+            "AttachStdout": True,
+            "AttachStderr": True,
+            "Cmd": cmd,
+        }
+        if working_dir:
+            config["WorkingDir"] = working_dir
+        
+        response = await api.post(f"/containers/{container_id}/exec", json=config)
+        response.raise_for_status()
+        exec_id = response.json()["Id"]
+        
+        response = await api.post(
+            f"/exec/{exec_id}/start", json={"Detach": False, "Tty": False}
+        )
+        response.raise_for_status()
+        stdout, stderr = _demux_stream(response.content)
+        
+        response = await api.get(f"/exec/{exec_id}/json")
+        response.raise_for_status()
+        return response.json()["ExitCode"], stdout, stderr
+    
+    async def _get_container(self, mounts: tuple[tuple[str, str], ...]) -> str:
+        """Get the container for a set of mounts, starting it if needed."""
+        async with self._lock:
+            container_id = self._containers.get(mounts)
+            if container_id is not None:
+                return container_id
+            
+            docker_cmd = [
+                "docker", "run",
+                "-d",
+                "--rm",
+                "--name", f"ow-{uuid4().hex[:12]}",
+                "--network", self.network,
+                "--memory", self.memory_limit,
+                "--cpus", self.cpu_limit,
+            ]
+            for host, container in mounts:
+                docker_cmd.extend(["-v", f"{host}:{container}:rw"])
+            docker_cmd.extend([self.image, "sleep", "infinity"])
+            
+            returncode, stdout, stderr = await _run_process(docker_cmd, 120)
+            if returncode != 0:
+                raise RuntimeError(
+                    stderr.decode("utf-8", errors="replace").strip()
+                    or "Failed to start container"
+                )
+            
+            container_id = stdout.decode("utf-8").strip()
+            self._containers[mounts] = container_id
+            return container_id
+    
+    async def _remove_container(self, mounts: tuple[tuple[str, str], ...]) -> None:
+        """Force-remove the container for a set of mounts."""
+        container_id = self._containers.pop(mounts, None)
+        if container_id is None:
+            return
+        try:
+            await _run_process(["docker", "rm", "-f", container_id], 30)
+        except Exception:
+            pass
+    
+    async def close(self) -> None:
+        """Remove all containers started by this sandbox."""
+        for mounts in list(self._containers):
+            await self._remove_container(mounts)
+        if self._api is not None:
+            await self._api.aclose()
+            self._api = None
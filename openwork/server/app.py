@@ -3,18 +3,35 @@
 from __future__ import annotations
 
 import asyncio
+import os
 from contextlib import asynccontextmanager
-from pathlib import Path
-from typing import Any
+from itertools import islice
+from typing import Any, Iterator
+from uuid import uuid4
 
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict
 
-from openwork.server.websocket import ConnectionManager
+from openwork.agent.loop import AgentLoop
+from openwork.llm.provider import LLMProvider, close_http_pool
+from openwork.server.store import create_store
+from openwork.server.websocket import ConnectionManager, encode_message
+from openwork.tools import BashTool, CodeTool, FileTool, SearchTool, WebTool
 
 
-class TaskRequest(BaseModel):
+class _Model(BaseModel):
+    """Base for API models; turns off validation passes the API never needs."""
+    model_config = ConfigDict(
+        extra="ignore",
+        validate_assignment=False,
+        str_strip_whitespace=False,
+        revalidate_instances="never",
+    )
+
+
+class TaskRequest(_Model):
     """Request model for creating a task."""
     task: str
     allowed_paths: list[str]
@@ -22,7 +39,7 @@ class TaskRequest(BaseModel):
     api_key: str | None = None
 
 
-class TaskResponse(BaseModel):
+class TaskResponse(_Model):
     """Response model for task status."""
     task_id: str
     status: str
@@ -31,7 +48,7 @@ class TaskResponse(BaseModel):
     iterations: int = 0
 
 
-class HealthResponse(BaseModel):
+class HealthResponse(_Model):
     """Health check response."""
     status: str
     version: str
@@ -39,22 +56,88 @@ class HealthResponse(BaseModel):
 
 manager = ConnectionManager()
 _agent_loop = None
-_tasks: dict[str, dict[str, Any]] = {}
+_store = create_store()
+
+# Tools only hold configuration and caches, so one set serves every task
+# and FileTool's read cache is shared across them.
+_shared_tools = (FileTool(), BashTool(), SearchTool(), WebTool(), CodeTool())
+
+
+async def _run_job(job: dict[str, Any]) -> None:
+    """Run a queued task and record its outcome in the store."""
+    task_id = job["task_id"]
+    try:
+        llm = LLMProvider(model=job["model"], api_key=job["api_key"])
+        agent = AgentLoop(llm=llm, tools=_shared_tools, verbose=True)
+        
+        async def on_event(event: str, data: Any = None):
+            await _store.publish({
+                "task_id": task_id,
+                "event": event,
+                "data": data,
+            })
+        
+        agent.add_callback(on_event)
+        
+        result = await agent.run(
+            task=job["task"],
+            allowed_paths=job["allowed_paths"],
+        )
+        
+        outcome = {
+            "status": "completed" if result.success else "failed",
+            "output": result.output,
+            "error": result.error,
+            "iterations": result.iterations,
+        }
+        await _store.update(task_id, **outcome)
+        
+        await _store.publish({
+            "task_id": task_id,
+            "event": "finished",
+            "data": outcome,
+        })
+        
+    except Exception as e:
+        await _store.update(task_id, status="failed", error=str(e))
+        await _store.publish({
+            "task_id": task_id,
+            "event": "error",
+            "data": {"error": str(e)},
+        })
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Application lifespan handler."""
-    yield
+    """
+    Application lifespan handler.
+    
+    Starts the task store's job consumer and event relay. With a Redis
+    store, every uvicorn worker pulls jobs from the shared queue and
+    forwards all task events to its own WebSocket clients.
+    """
+    await _store.start(_run_job, manager.broadcast)
+    try:
+        yield
+    finally:
+        await _store.close()
+        await manager.flush()
+        await asyncio.gather(*(tool.close() for tool in _shared_tools))
+        await close_http_pool()
 
 
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application."""
+    import importlib.util
+    
     app = FastAPI(
         title="OpenWork API",
         description="Open source AI agent for local file automation",
         version="0.1.0",
         lifespan=lifespan,
+        default_response_class=(
+            ORJSONResponse if importlib.util.find_spec("orjson") else JSONResponse
+        ),
     )
     
     app.add_middleware(
@@ -88,72 +171,32 @@ def create_app() -> FastAPI:
     
     @app.post("/tasks", response_model=TaskResponse)
     async def create_task(request: TaskRequest):
-        """Create and execute a new task."""
-        from uuid import uuid4
-        from openwork.llm.provider import LLMProvider
-        from openwork.agent.loop import AgentLoop
-        from openwork.tools import FileTool, BashTool, SearchTool, WebTool, CodeTool
-        
+        """Create and queue a new task."""
         if not request.api_key:
             raise HTTPException(status_code=400, detail="API key is required")
         
-        for path in request.allowed_paths:
-            if not Path(path).exists():
-                raise HTTPException(status_code=400, detail=f"Path does not exist: {path}")
+        # Stat every path in one worker thread rather than on the event loop
+        missing = await asyncio.to_thread(
+            lambda: [p for p in request.allowed_paths if not os.path.exists(p)]
+        )
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Path does not exist: {missing[0]}")
         
         task_id = str(uuid4())
-        _tasks[task_id] = {
-            "status": "running",
-            "output": None,
-            "error": None,
-            "iterations": 0,
-        }
-        
-        async def run_task():
-            try:
-                llm = LLMProvider(model=request.model, api_key=request.api_key)
-                tools = [FileTool(), BashTool(), SearchTool(), WebTool(), CodeTool()]
-                agent = AgentLoop(llm=llm, tools=tools, verbose=True)
-                
-                async def on_event(event: str, data: Any = None):
-                    await manager.broadcast({
-                        "task_id": task_id,
-                        "event": event,
-                        "data": data,
-                    })
-                
-                agent.add_callback(on_event)
-                
-                result = await agent.run(
-                    task=request.task,
-                    allowed_paths=request.allowed_paths,
-                )
-                
-                _tasks[task_id].update({
-                    "status": "completed" if result.success else "failed",
-                    "output": result.output,
-                    "error": result.error,
-                    "iterations": result.iterations,
-                })
-                
-                await manager.broadcast({
-                    "task_id": task_id,
-                    "event": "finished",
-                    "data": _tasks[task_id],
-                })
-                
-            except Exception as e:
-                _tasks[task_id].update({
-                    "status": "failed",
-                    "error": str(e),
-                })
-                await manager.broadcast({
-                    "task_id": task_id,
-                    "event": "error",
-                    "data": {"error": str(e)},
-                })
-        
-        asyncio.create_task(run_task())
+        await _store.update(
+            task_id,
+            status="running",
+            output=None,
+            error=None,
+            iterations=0,
+        )
+        await _store.submit({
+            "task_id": task_id,
+            "task": request.task,
+            "allowed_paths": request.allowed_paths,
+            "model": request.model,
+            "api_key": request.api_key,
+        })
         
         return TaskResponse(
             task_id=task_id,
@@ -163,30 +206,42 @@ def create_app() -> FastAPI:
     @app.get("/tasks/{task_id}", response_model=TaskResponse)
     async def get_task(task_id: str):
         """Get task status by ID."""
-        if task_id not in _tasks:
+        task = await _store.get(task_id)
+        if task is None:
             raise HTTPException(status_code=404, detail="Task not found")
         
-        task = _tasks[task_id]
-        return TaskResponse(
+        # Store records already match the schema, so skip validation and
+        # return the serialized body directly instead of having FastAPI
+        # validate the model a second time.
+        response = TaskResponse.model_construct(
             task_id=task_id,
-            status=task["status"],
-            output=task.get("output"),
-            error=task.get("error"),
-            iterations=task.get("iterations", 0),
+            status=task.status,
+            output=task.output,
+            error=task.error,
+            iterations=task.iterations,
         )
+        return Response(response.model_dump_json(), media_type="application/json")
     
     @app.get("/tasks")
-    async def list_tasks():
-        """List all tasks."""
-        return {
-            "tasks": [
-                {
-                    "task_id": tid,
-                    "status": t["status"],
-                }
-                for tid, t in _tasks.items()
-            ]
-        }
+    async def list_tasks(limit: int | None = None, offset: int = 0):
+        """List tasks, optionally one page at a time."""
+        records = (await _store.all()).items()
+        stop = None if limit is None else offset + max(limit, 0)
+        # The page is taken now, on the event loop; the body is sent from
+        # a worker thread while new tasks may still be added.
+        page = [(tid, t.status) for tid, t in islice(records, max(offset, 0), stop)]
+        
+        def body() -> Iterator[str]:
+            # Each task is encoded as it is sent rather than building the
+            # whole list first.
+            yield '{"tasks":['
+            separator = ""
+            for tid, status in page:
+                yield separator + encode_message({"task_id": tid, "status": status})
+                separator = ","
+            yield "]}"
+        
+        return StreamingResponse(body(), media_type="application/json")
     
     @app.websocket("/ws")
     async def websocket_endpoint(websocket: WebSocket):
@@ -205,9 +260,14 @@ app = create_app()
 
 
 def run_server(host: str = "127.0.0.1", port: int = 8765):
-    """Run the FastAPI server."""
+    """Run the FastAPI server, on uvloop and httptools when installed."""
+    import importlib.util
     import uvicorn
-    uvicorn.run(app, host=host, port=port)
+    from openwork.runtime import install_uvloop
+    
+    loop = "uvloop" if install_uvloop() else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    uvicorn.run(app, host=host, port=port, loop=loop, http=http, ws="websockets")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,257 @@
+"""Task state, job queue and event channel for the API server."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Protocol
+
+
+JobHandler = Callable[[dict[str, Any]], Awaitable[None]]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class TaskRecord:
+    """Status of a submitted task."""
+    status: str = "running"
+    output: str | None = None
+    error: str | None = None
+    iterations: int = 0
+
+
+class TaskStore(Protocol):
+    """
+    Backend holding task records, pending jobs and task events.
+    
+    A single-process server uses MemoryTaskStore. With several uvicorn
+    workers, RedisTaskStore shares state so any worker can answer status
+    queries, run queued jobs and relay events to its WebSocket clients.
+    """
+    
+    async def update(self, task_id: str, **fields: Any) -> None:
+        """Create or update fields of a task record."""
+        ...
+    
+    async def get(self, task_id: str) -> TaskRecord | None:
+        """Get a task record, or None if unknown."""
+        ...
+    
+    async def all(self) -> dict[str, TaskRecord]:
+        """Get all task records by id."""
+        ...
+    
+    async def submit(self, job: dict[str, Any]) -> None:
+        """Queue a job for a worker to run."""
+        ...
+    
+    async def publish(self, event: dict[str, Any]) -> None:
+        """Publish a task event to every server worker."""
+        ...
+    
+    async def start(self, run_job: JobHandler, relay: JobHandler) -> None:
+        """Start consuming jobs with run_job and forwarding events to relay."""
+        ...
+    
+    async def close(self) -> None:
+        """Stop background work and release connections."""
+        ...
+
+
+class MemoryTaskStore:
+    """
+    In-process store; jobs run as local tasks and events go straight to relay.
+    
+    Running jobs are held in a set and dropped by a done callback, so the
+    event loop's weak references are never the only thing keeping them
+    alive and finished tasks are released promptly.
+    """
+    
+    def __init__(self):
+        self._tasks: dict[str, TaskRecord] = {}
+        self._running: set[asyncio.Task] = set()
+        self._run_job: JobHandler | None = None
+        self._relay: JobHandler | None = None
+    
+    async def update(self, task_id: str, **fields: Any) -> None:
+        record = self._tasks.get(task_id)
+        if record is None:
+            record = self._tasks[task_id] = TaskRecord()
+        for name, value in fields.items():
+            setattr(record, name, value)
+    
+    async def get(self, task_id: str) -> TaskRecord | None:
+        return self._tasks.get(task_id)
+    
+    async def all(self) -> dict[str, TaskRecord]:
+        return dict(self._tasks)
+    
+    async def submit(self, job: dict[str, Any]) -> None:
+        task = asyncio.create_task(self._run_job(job), name=f"task-{job['task_id']}")
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+    
+    async def publish(self, event: dict[str, Any]) -> None:
+        await self._relay(event)
+    
+    @property
+    def running(self) -> int:
+        """Number of jobs currently running."""
+        return len(self._running)
+    
+    async def start(self, run_job: JobHandler, relay: JobHandler) -> None:
+        self._run_job = run_job
+        self._relay = relay
+    
+    async def close(self) -> None:
+        for task in self._running:
+            task.cancel()
+
+
+class RedisTaskStore:
+    """
+    Redis-backed store for running several server workers.
+    
+    Task records are hashes at {prefix}:task:{id} with JSON-encoded
+    values, and task ids are kept in the {prefix}:task_order sorted set scored
+    by creation time, so all() lists them in creation order like
+    MemoryTaskStore. Jobs are pushed to the {prefix}:jobs list and popped
+    with BRPOP by every worker's consumer loop. Delivery is at most once:
+    a job popped by a worker that dies before finishing it is lost, and
+    its task stays "running". Consumers retry with backoff when Redis is
+    unreachable. Events are published on the {prefix}:events channel and
+    relayed by every worker. Jobs carry the request's API key, so the
+    Redis instance must be trusted.
+    
+    Requires the optional redis package (pip install redis).
+    """
+    
+    def __init__(self, url: str, prefix: str = "openwork", concurrency: int = 4):
+        try:
+            import redis.asyncio as redis
+            from redis.exceptions import ConnectionError, TimeoutError
+        except ImportError:
+            raise ImportError("redis is required for RedisTaskStore. Install with: pip install redis")
+        
+        self._redis = redis.from_url(url, decode_responses=True)
+        self._transient_errors = (ConnectionError, TimeoutError)
+        self.prefix = prefix
+        self.concurrency = concurrency
+        self._workers: list[asyncio.Task] = []
+    
+    def _task_key(self, task_id: str) -> str:
+        return f"{self.prefix}:task:{task_id}"
+    
+    async def update(self, task_id: str, **fields: Any) -> None:
+        mapping = {key: json.dumps(value) for key, value in fields.items()}
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.hset(self._task_key(task_id), mapping=mapping)
+            pipe.zadd(f"{self.prefix}:task_order", {task_id: time.time()}, nx=True)
+            await pipe.execute()
+    
+    async def get(self, task_id: str) -> TaskRecord | None:
+        record = await self._redis.hgetall(self._task_key(task_id))
+        if not record:
+            return None
+        return _decode_record(record)
+    
+    async def all(self) -> dict[str, TaskRecord]:
+        task_ids = await self._redis.zrange(f"{self.prefix}:task_order", 0, -1)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for task_id in task_ids:
+                pipe.hgetall(self._task_key(task_id))
+            records = await pipe.execute()
+        return {
+            task_id: _decode_record(record)
+            for task_id, record in zip(task_ids, records)
+            if record
+        }
+    
+    async def submit(self, job: dict[str, Any]) -> None:
+        await self._redis.lpush(f"{self.prefix}:jobs", json.dumps(job))
+    
+    async def publish(self, event: dict[str, Any]) -> None:
+        await self._redis.publish(f"{self.prefix}:events", json.dumps(event))
+    
+    async def start(self, run_job: JobHandler, relay: JobHandler) -> None:
+        self._workers = [
+            asyncio.create_task(self._consume_jobs(run_job), name=f"job-consumer-{i}")
+            for i in range(self.concurrency)
+        ]
+        self._workers.append(
+            asyncio.create_task(self._relay_events(relay), name="event-relay")
+        )
+    
+    async def _consume_jobs(self, run_job: JobHandler) -> None:
+        """
+        Pop jobs off the shared list and run them one at a time.
+        
+        Connection errors and timeouts from Redis are retried with
+        exponential backoff (up to 30 seconds) instead of ending the loop.
+        """
+        delay = 0.5
+        while True:
+            try:
+                item = await self._redis.brpop(f"{self.prefix}:jobs", timeout=0)
+            except self._transient_errors as e:
+                logger.warning("Job consumer lost Redis, retrying in %.1fs: %s", delay, e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+                continue
+            delay = 0.5
+            if item is None:
+                continue
+            _, payload = item
+            try:
+                await run_job(json.loads(payload))
+            except Exception:
+                pass
+    
+    async def _relay_events(self, relay: JobHandler) -> None:
+        """Forward published events to this worker's clients."""
+        async for event in self._subscribe():
+            try:
+                await relay(event)
+            except Exception:
+                pass
+    
+    async def _subscribe(self) -> AsyncIterator[dict[str, Any]]:
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(f"{self.prefix}:events")
+        try:
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    yield json.loads(message["data"])
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.close()
+    
+    async def close(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        await self._redis.close()
+
+
+def _decode_record(record: dict[str, str]) -> TaskRecord:
+    """Build a TaskRecord from a Redis hash of JSON-encoded fields."""
+    return TaskRecord(**{key: json.loads(value) for key, value in record.items()})
+
+
+def create_store() -> TaskStore:
+    """
+    Create the task store for this server process.
+    
+    Uses Redis when OPENWORK_REDIS_URL is set, otherwise an in-process
+    store.
+    """
+    url = os.environ.get("OPENWORK_REDIS_URL")
+    if url:
+        return RedisTaskStore(url)
+    return MemoryTaskStore()
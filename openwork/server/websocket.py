@@ -2,40 +2,111 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 from typing import Any
 
 from fastapi import WebSocket
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def encode_message(message: dict[str, Any] | list[dict[str, Any]]) -> str:
+    """Encode a message as compact JSON text, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(message, separators=(",", ":"))
+
 
 class ConnectionManager:
-    """Manages WebSocket connections for broadcasting updates."""
+    """
+    Manages WebSocket connections for broadcasting updates.
+    
+    Connections are held in a set, so connecting, disconnecting and
+    membership checks stay O(1) under client churn. Broadcasts encode the
+    message once and send to a snapshot of the set concurrently, so one
+    slow client does not delay the others.
+    
+    Bursts of events are coalesced: messages are buffered for up to
+    batch_window seconds or max_batch messages and sent as one JSON array.
+    A lone message is still sent as a plain object, and "finished" and
+    "error" events flush the buffer at once.
+    """
+    
+    FLUSH_EVENTS = frozenset({"finished", "error"})
     
-    def __init__(self):
-        self.active_connections: list[WebSocket] = []
+    def __init__(self, batch_window: float = 0.01, max_batch: int = 64):
+        self.active_connections: set[WebSocket] = set()
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._pending: list[dict[str, Any]] = []
+        self._flush_timer: asyncio.TimerHandle | None = None
+        self._flush_tasks: set[asyncio.Task] = set()
+        self._send_lock = asyncio.Lock()
     
     async def connect(self, websocket: WebSocket):
         """Accept and store a new WebSocket connection."""
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections.add(websocket)
     
     def disconnect(self, websocket: WebSocket):
         """Remove a WebSocket connection."""
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        self.active_connections.discard(websocket)
     
     async def send_personal_message(self, message: dict[str, Any], websocket: WebSocket):
         """Send a message to a specific connection."""
-        await websocket.send_text(json.dumps(message))
+        await websocket.send_text(encode_message(message))
     
     async def broadcast(self, message: dict[str, Any]):
-        """Broadcast a message to all connected clients."""
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(json.dumps(message))
-            except Exception:
-                disconnected.append(connection)
+        """Queue a message for all connected clients."""
+        if not self.active_connections:
+            return
+        
+        self._pending.append(message)
+        if (
+            self.batch_window <= 0
+            or len(self._pending) >= self.max_batch
+            or message.get("event") in self.FLUSH_EVENTS
+        ):
+            await self.flush()
+        elif self._flush_timer is None:
+            self._flush_timer = asyncio.get_running_loop().call_later(
+                self.batch_window, self._start_flush
+            )
+    
+    def _start_flush(self) -> None:
+        """Run a flush when the batch window closes."""
+        self._flush_timer = None
+        task = asyncio.create_task(self.flush(), name="ws-flush")
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+    
+    async def flush(self):
+        """Send all buffered messages to all connected clients."""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if not self._pending:
+            return
+        
+        batch, self._pending = self._pending, []
+        payload = encode_message(batch[0] if len(batch) == 1 else batch)
+        
+        # Sends are serialized so batches reach each client in order
+        async with self._send_lock:
+            await self._send_all(payload)
+    
+    async def _send_all(self, payload: str):
+        """Send encoded text to every connection, dropping failed ones."""
+        connections = list(self.active_connections)
+        results = await asyncio.gather(
+            *(connection.send_text(payload) for connection in connections),
+            return_exceptions=True,
+        )
         
-        for conn in disconnected:
-            self.disconnect(conn)
+        for conn, result in zip(connections, results):
+            if isinstance(result, Exception):
+                self.disconnect(conn)
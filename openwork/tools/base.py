@@ -2,18 +2,91 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
+import re
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Callable, Iterable
+
+
+def decode_output(data: bytes, max_length: int) -> str:
+    """
+    Decode subprocess output, keeping at most max_length bytes.
+    
+    Only the retained bytes are decoded, through a memoryview, so large
+    outputs are never copied or decoded in full just to be truncated.
+    """
+    if len(data) <= max_length:
+        return data.decode("utf-8", errors="replace")
+    head = str(memoryview(data)[:max_length], "utf-8", "replace")
+    return head + "\n... (truncated)"
+
+
+async def read_limited(stream: asyncio.StreamReader, limit: int | None) -> bytearray:
+    """
+    Read a subprocess stream to EOF, keeping at most limit + 1 bytes.
+    
+    Output past the limit is read and discarded so the process is never
+    blocked on a full pipe, while memory stays bounded. The extra byte
+    lets decode_output tell that the output was truncated. A limit of
+    None keeps everything.
+    """
+    buffer = bytearray()
+    keep = None if limit is None else limit + 1
+    while True:
+        chunk = await stream.read(65536)
+        if not chunk:
+            return buffer
+        if keep is None:
+            buffer += chunk
+        elif len(buffer) < keep:
+            buffer += chunk[:keep - len(buffer)]
+
+
+def pattern_matcher(patterns: Iterable[str]) -> Callable[[str], str | None]:
+    """
+    Build a case-insensitive substring matcher over a list of patterns.
+    
+    The patterns are lowercased once and compiled into a single
+    case-insensitive regex alternation, so a check is one scan of the text
+    with no lowercased copy of it. The returned function gives the pattern
+    found in the text, or None.
+    """
+    originals: dict[str, str] = {}
+    for pattern in patterns:
+        originals.setdefault(pattern.lower(), pattern)
+    if not originals:
+        return lambda text: None
+    
+    # Longest first, so overlapping patterns report the most specific one
+    regex = re.compile("|".join(
+        re.escape(pattern) for pattern in sorted(originals, key=len, reverse=True)
+    ), re.IGNORECASE)
+    
+    def match(text: str) -> str | None:
+        found = regex.search(text)
+        if found is None:
+            return None
+        matched = found.group(0)
+        return originals.get(matched.lower(), matched)
+    
+    return match
 
 
 @dataclass
 class ToolResult:
-    """Result of a tool execution."""
+    """
+    Result of a tool execution.
+    
+    content_type is set when output is already serialized text (e.g.
+    "application/json"), so it can be shown to the LLM as is.
+    """
     success: bool
     output: Any
     error: str | None = None
     metadata: dict[str, Any] | None = None
+    content_type: str | None = None
 
 
 class BaseTool(ABC):
@@ -25,12 +98,16 @@ class BaseTool(ABC):
     - description: Human-readable description
     - parameters: JSON schema for parameters
     - execute: Async execution method
+    
+    Tools marked deterministic return the same result for the same
+    read-only call, so the agent may reuse it within a run.
     """
     
     name: str
     description: str
     parameters: dict[str, Any]
     requires_path_check: bool = False
+    deterministic: bool = False
     
     @abstractmethod
     async def execute(self, **kwargs: Any) -> ToolResult:
@@ -45,16 +122,45 @@ class BaseTool(ABC):
         """
         pass
     
+    def is_concurrency_safe(self, **kwargs: Any) -> bool:
+        """
+        Check if a call can run concurrently with other tool calls.
+        
+        Tools that may modify state should override this to return False
+        so the agent runs them on the serial path.
+        """
+        return True
+    
     def to_schema(self) -> dict[str, Any]:
-        """Convert tool to LLM function calling schema."""
-        return {
-            "type": "function",
-            "function": {
-                "name": self.name,
-                "description": self.description,
-                "parameters": self.parameters,
+        """
+        Convert tool to LLM function calling schema.
+        
+        The schema is built once per instance and the same dict is
+        returned on later calls, so callers must not modify it.
+        """
+        schema = self.__dict__.get("_schema")
+        if schema is None:
+            schema = self._schema = {
+                "type": "function",
+                "function": {
+                    "name": self.name,
+                    "description": self.description,
+                    "parameters": self.parameters,
+                }
             }
-        }
+        return schema
+    
+    def to_schema_bytes(self) -> bytes:
+        """The function calling schema pre-serialized as JSON bytes."""
+        data = self.__dict__.get("_schema_bytes")
+        if data is None:
+            try:
+                import orjson
+                data = orjson.dumps(self.to_schema())
+            except ImportError:
+                data = json.dumps(self.to_schema(), separators=(",", ":")).encode("utf-8")
+            self._schema_bytes = data
+        return data
     
     def validate_params(self, **kwargs: Any) -> tuple[bool, str | None]:
         """
@@ -68,3 +174,6 @@ class BaseTool(ABC):
             if param not in kwargs:
                 return False, f"Missing required parameter: {param}"
         return True, None
+    
+    async def close(self) -> None:
+        """Release resources held across calls, such as connections or workers."""
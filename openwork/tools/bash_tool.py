@@ -3,10 +3,22 @@
 from __future__ import annotations
 
 import asyncio
+import re
 import shlex
 from typing import Any
 
-from openwork.tools.base import BaseTool, ToolResult
+from openwork.tools.base import (
+    BaseTool,
+    ToolResult,
+    decode_output,
+    pattern_matcher,
+    read_limited,
+)
+
+
+# Characters that need a shell to interpret: operators, redirection,
+# expansion, globbing, quoting, comments and line breaks
+_SHELL_SYNTAX = re.compile(r"[|&;<>()$`\\\"'*?\[\]{}~#=!\n]")
 
 
 class BashTool(BaseTool):
@@ -17,6 +29,9 @@ class BashTool(BaseTool):
     - Command timeout
     - Working directory restriction
     - Configurable command whitelist/blacklist
+    
+    Plain commands without any shell syntax are run directly, skipping the
+    intermediate /bin/sh; anything else goes through the shell as usual.
     """
     
     name = "bash"
@@ -71,18 +86,22 @@ class BashTool(BaseTool):
         self.max_output_length = max_output_length
         self.allowed_commands = allowed_commands
         self.blocked_commands = blocked_commands or self.BLOCKED_PATTERNS
+        self._match_dangerous = pattern_matcher(self.DANGEROUS_COMMANDS)
+        self._match_blocked = pattern_matcher(self.blocked_commands)
+    
+    def is_concurrency_safe(self, **kwargs: Any) -> bool:
+        """Commands may modify anything, so always run serially."""
+        return False
     
     def _is_command_safe(self, command: str) -> tuple[bool, str | None]:
         """Check if command is safe to execute."""
-        command_lower = command.lower().strip()
+        dangerous = self._match_dangerous(command)
+        if dangerous is not None:
+            return False, f"Dangerous command pattern detected: {dangerous}"
         
-        for dangerous in self.DANGEROUS_COMMANDS:
-            if dangerous in command_lower:
-                return False, f"Dangerous command pattern detected: {dangerous}"
-        
-        for blocked in self.blocked_commands:
-            if blocked.lower() in command_lower:
-                return False, f"Blocked command pattern: {blocked}"
+        blocked = self._match_blocked(command)
+        if blocked is not None:
+            return False, f"Blocked command pattern: {blocked}"
         
         if self.allowed_commands:
             cmd_parts = shlex.split(command)
@@ -91,6 +110,23 @@ class BashTool(BaseTool):
         
         return True, None
     
+    async def _spawn(self, command: str, working_dir: str | None) -> asyncio.subprocess.Process:
+        """Start command directly when it is a plain argv, else via the shell."""
+        options = dict(
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=working_dir,
+        )
+        if not _SHELL_SYNTAX.search(command):
+            argv = command.split()
+            if argv:
+                try:
+                    return await asyncio.create_subprocess_exec(*argv, **options)
+                except FileNotFoundError:
+                    # Shell builtins such as cd or export have no binary
+                    pass
+        return await asyncio.create_subprocess_shell(command, **options)
+    
     async def execute(self, **kwargs: Any) -> ToolResult:
         """Execute bash command."""
         command = kwargs.get("command")
@@ -113,16 +149,15 @@ class BashTool(BaseTool):
             )
         
         try:
-            process = await asyncio.create_subprocess_shell(
-                command,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=working_dir,
-            )
+            process = await self._spawn(command, working_dir)
             
             try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
+                stdout, stderr, _ = await asyncio.wait_for(
+                    asyncio.gather(
+                        read_limited(process.stdout, self.max_output_length),
+                        read_limited(process.stderr, self.max_output_length),
+                        process.wait(),
+                    ),
                     timeout=timeout
                 )
             except asyncio.TimeoutError:
@@ -133,13 +168,8 @@ class BashTool(BaseTool):
                     error=f"Command timed out after {timeout} seconds"
                 )
             
-            stdout_str = stdout.decode("utf-8", errors="replace")
-            stderr_str = stderr.decode("utf-8", errors="replace")
-            
-            if len(stdout_str) > self.max_output_length:
-                stdout_str = stdout_str[:self.max_output_length] + "\n... (truncated)"
-            if len(stderr_str) > self.max_output_length:
-                stderr_str = stderr_str[:self.max_output_length] + "\n... (truncated)"
+            stdout_str = decode_output(stdout, self.max_output_length)
+            stderr_str = decode_output(stderr, self.max_output_length)
             
             success = process.returncode == 0
             
@@ -2,12 +2,155 @@
 
 from __future__ import annotations
 
+import ast
 import asyncio
-import tempfile
-from pathlib import Path
+import json
+import sys
+from functools import lru_cache
 from typing import Any
 
-from openwork.tools.base import BaseTool, ToolResult
+from openwork.tools.base import (
+    BaseTool,
+    ToolResult,
+    decode_output,
+    read_limited,
+)
+
+
+# Source of a pooled worker: runs one JSON request per stdin line and
+# answers on a private copy of stdout, while fd 1 is pointed at stderr
+# so stray writes from user code cannot corrupt the protocol. argv[1]
+# holds the [memory bytes, CPU seconds per request] limits; the CPU
+# limit is re-armed before each request as usage so far plus the budget.
+_WORKER_SOURCE = """
+import contextlib, io, json, os, sys
+try:
+    import resource
+except ImportError:
+    resource = None
+_memory, _cpu = json.loads(sys.argv[1])
+if resource is not None and _memory:
+    resource.setrlimit(resource.RLIMIT_AS, (_memory, _memory))
+_reply = os.fdopen(os.dup(1), "w", buffering=1)
+os.dup2(2, 1)
+_home = os.getcwd()
+for _line in sys.stdin:
+    _request = json.loads(_line)
+    _out, _err, _error = io.StringIO(), io.StringIO(), None
+    if resource is not None and _cpu:
+        _usage = resource.getrusage(resource.RUSAGE_SELF)
+        _soft = int(_usage.ru_utime + _usage.ru_stime) + 1 + _cpu
+        _hard = resource.getrlimit(resource.RLIMIT_CPU)[1]
+        if _hard != resource.RLIM_INFINITY:
+            _soft = min(_soft, _hard)
+        resource.setrlimit(resource.RLIMIT_CPU, (_soft, _hard))
+    try:
+        os.chdir(_request.get("cwd") or _home)
+        with contextlib.redirect_stdout(_out), contextlib.redirect_stderr(_err):
+            exec(compile(_request["code"], "<code>", "exec"), {"__name__": "__main__"})
+    except BaseException as e:
+        _error = str(e) or type(e).__name__
+    _reply.write(json.dumps({"stdout": _out.getvalue(), "stderr": _err.getvalue(), "error": _error}) + "\\n")
+"""
+
+
+class _PythonWorker:
+    """A long-lived interpreter that runs code sent over its stdin."""
+    
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+    
+    @classmethod
+    async def start(
+        cls,
+        executable: str,
+        memory_limit: int | None,
+        cpu_limit: int | None,
+    ) -> _PythonWorker:
+        process = await asyncio.create_subprocess_exec(
+            executable, "-c", _WORKER_SOURCE, json.dumps([memory_limit, cpu_limit]),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            limit=2 ** 26,
+        )
+        return cls(process)
+    
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+    
+    async def run(self, code: str, cwd: str | None) -> dict[str, Any]:
+        """Execute code and return its stdout, stderr and error."""
+        request = json.dumps({"code": code, "cwd": cwd}) + "\n"
+        self.process.stdin.write(request.encode("utf-8"))
+        await self.process.stdin.drain()
+        line = await self.process.stdout.readline()
+        if not line:
+            raise RuntimeError("Python worker exited unexpectedly")
+        return json.loads(line)
+    
+    async def kill(self) -> None:
+        """Kill the worker and reap its process."""
+        if self.alive:
+            self.process.kill()
+        await self.process.wait()
+
+
+def _is_blocked_module(name: str, modules: frozenset[str]) -> bool:
+    """Check if a dotted module name or any of its parents is blocked."""
+    parts = name.split(".")
+    return any(".".join(parts[:i]) in modules for i in range(1, len(parts) + 1))
+
+
+@lru_cache(maxsize=128)
+def _find_blocked(
+    code: str,
+    modules: frozenset[str],
+    calls: frozenset[str],
+    names: frozenset[str],
+) -> str | None:
+    """
+    Find the first blocked import, call or name in code.
+    
+    The source is parsed once and its imports, calls and names are checked
+    against the given sets, so "import osmium" is not mistaken for
+    "import os". Verdicts are cached because a failed run is often
+    retried with the same code.
+    
+    Returns:
+        Error message, or None if nothing blocked was found. Code that does
+        not parse is let through for the interpreter to report.
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+    
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if _is_blocked_module(alias.name, modules):
+                    return f"Blocked import: {alias.name}"
+        elif isinstance(node, ast.ImportFrom):
+            if node.level or not node.module:
+                continue
+            if _is_blocked_module(node.module, modules):
+                return f"Blocked import: {node.module}"
+            for alias in node.names:
+                if f"{node.module}.{alias.name}" in modules:
+                    return f"Blocked import: {node.module}.{alias.name}"
+        elif isinstance(node, ast.Call):
+            if isinstance(node.func, ast.Name) and node.func.id in calls:
+                return f"Blocked call: {node.func.id}()"
+        elif isinstance(node, ast.Name):
+            if node.id in names:
+                return f"Blocked name: {node.id}"
+        elif isinstance(node, ast.Attribute):
+            if node.attr in names:
+                return f"Blocked name: {node.attr}"
+    
+    return None
 
 
 class CodeTool(BaseTool):
@@ -19,6 +162,17 @@ class CodeTool(BaseTool):
     - Timeout protection
     - Output capture
     - Optional working directory
+    
+    With pool_size > 0, code runs in up to that many long-lived Python
+    workers instead of a fresh interpreter per call, avoiding startup
+    cost. Each call gets fresh globals, but imported modules and other
+    process state persist between calls in a worker. A worker that times
+    out is killed and replaced. Call close() to stop the workers.
+    
+    Where the resource module is available, each worker's address space
+    is capped at worker_memory_limit bytes and each call may use at most
+    worker_cpu_limit CPU seconds; a worker that exceeds the CPU limit is
+    killed by the OS. Both paths run code with PYTHON_EXECUTABLE.
     """
     
     name = "code"
@@ -44,45 +198,56 @@ class CodeTool(BaseTool):
         "required": ["code"]
     }
     
-    BLOCKED_IMPORTS = [
-        "os.system",
-        "subprocess",
-        "shutil.rmtree",
-        "__import__",
-        "exec",
-        "eval",
-        "compile",
-        "open",  # restrict file access
-    ]
-    
-    BLOCKED_PATTERNS = [
-        "import os",
-        "from os import",
-        "import subprocess",
-        "import shutil",
-        "import sys",
-        "__builtins__",
-        "globals()",
-        "locals()",
-    ]
+    # Modules (with their submodules) and dotted names that may not be
+    # imported, e.g. "shutil.rmtree" blocks only that name
+    BLOCKED_IMPORTS = frozenset({"os", "subprocess", "shutil", "sys"})
+    
+    # Builtins that may not be called by name
+    BLOCKED_CALLS = frozenset({"__import__", "exec", "eval", "compile", "globals", "locals"})
+    
+    # Names that may not be referenced at all
+    BLOCKED_NAMES = frozenset({"__builtins__"})
+    
+    # Interpreter for both the per-call process and pooled workers
+    PYTHON_EXECUTABLE = sys.executable
+    
+    # Wrappers of this many UTF-8 bytes or more are sent over stdin rather
+    # than argv; the kernel's per-argument limit (MAX_ARG_STRLEN) counts
+    # bytes including the terminating NUL
+    MAX_ARGV_CODE_LENGTH = 128 * 1024
     
     def __init__(
         self,
         default_timeout: int = 30,
         max_output_length: int = 50000,
         allow_file_access: bool = False,
+        pool_size: int = 0,
+        worker_memory_limit: int | None = 2 * 1024 * 1024 * 1024,
+        worker_cpu_limit: int | None = 60,
     ):
         self.default_timeout = default_timeout
         self.max_output_length = max_output_length
         self.allow_file_access = allow_file_access
+        self.pool_size = pool_size
+        self.worker_memory_limit = worker_memory_limit
+        self.worker_cpu_limit = worker_cpu_limit
+        self._idle_workers: list[_PythonWorker] = []
+        self._worker_slots: asyncio.Semaphore | None = None
+    
+    def is_concurrency_safe(self, **kwargs: Any) -> bool:
+        """Code may modify anything, so always run serially."""
+        return False
     
     def _is_code_safe(self, code: str) -> tuple[bool, str | None]:
         """Check if code is safe to execute."""
-        code_lower = code.lower()
-        
-        for pattern in self.BLOCKED_PATTERNS:
-            if pattern.lower() in code_lower:
-                return False, f"Blocked pattern detected: {pattern}"
+        reason = _find_blocked(
+            code,
+            frozenset(self.BLOCKED_IMPORTS),
+            frozenset(self.BLOCKED_CALLS),
+            frozenset(self.BLOCKED_NAMES),
+        )
+        if reason is not None:
+            return False, reason
         
         return True, None
     
@@ -108,6 +273,9 @@ class CodeTool(BaseTool):
                     error=error
                 )
         
+        if self.pool_size:
+            return await self._execute_in_worker(code, working_dir, timeout)
+        
         wrapper_code = f'''
 import json
 import sys
@@ -126,7 +294,7 @@ _error = None
 try:
 {self._indent_code(code)}
 except Exception as e:
-    _error = str(e)
+    _error = str(e) or type(e).__name__
 
 sys.stdout = _old_stdout
 sys.stderr = _old_stderr
@@ -138,76 +306,70 @@ output = {{
 }}
 print(json.dumps(output))
 '''
+
+        # Pass the wrapper as an argument; very large code goes over stdin
+        # instead to stay clear of the OS argument length limit.
+        wrapper_bytes = wrapper_code.encode("utf-8")
+        use_stdin = len(wrapper_bytes) >= self.MAX_ARGV_CODE_LENGTH
         
         try:
-            with tempfile.NamedTemporaryFile(
-                mode='w',
-                suffix='.py',
-                delete=False
-            ) as f:
-                f.write(wrapper_code)
-                temp_file = f.name
+            process = await asyncio.create_subprocess_exec(
+                self.PYTHON_EXECUTABLE,
+                *(('-',) if use_stdin else ('-c', wrapper_code)),
+                stdin=asyncio.subprocess.PIPE if use_stdin else None,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=working_dir,
+            )
+            
+            async def feed() -> None:
+                if use_stdin:
+                    process.stdin.write(wrapper_bytes)
+                    await process.stdin.drain()
+                    process.stdin.close()
             
+            # stdout carries the JSON result envelope and must be read
+            # whole; stderr is only shown truncated, so it is bounded.
             try:
-                process = await asyncio.create_subprocess_exec(
-                    'python3', temp_file,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                    cwd=working_dir,
+                _, stdout, stderr, _ = await asyncio.wait_for(
+                    asyncio.gather(
+                        feed(),
+                        read_limited(process.stdout, None),
+                        read_limited(process.stderr, self.max_output_length),
+                        process.wait(),
+                    ),
+                    timeout=timeout
                 )
-                
-                try:
-                    stdout, stderr = await asyncio.wait_for(
-                        process.communicate(),
-                        timeout=timeout
-                    )
-                except asyncio.TimeoutError:
-                    process.kill()
-                    return ToolResult(
-                        success=False,
-                        output=None,
-                        error=f"Code execution timed out after {timeout} seconds"
-                    )
-                
-                if process.returncode != 0:
-                    return ToolResult(
-                        success=False,
-                        output=None,
-                        error=f"Process exited with code {process.returncode}: {stderr.decode()}"
-                    )
-                
-                import json
-                try:
-                    result = json.loads(stdout.decode())
-                except json.JSONDecodeError:
-                    return ToolResult(
-                        success=False,
-                        output=stdout.decode()[:self.max_output_length],
-                        error="Failed to parse execution result"
-                    )
-                
-                if result.get("error"):
-                    return ToolResult(
-                        success=False,
-                        output=result.get("stdout", ""),
-                        error=result["error"]
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                return ToolResult(
+                    success=False,
+                    output=None,
+                    error=f"Code execution timed out after {timeout} seconds"
+                )
+            
+            if process.returncode != 0:
+                return ToolResult(
+                    success=False,
+                    output=None,
+                    error=(
+                        f"Process exited with code {process.returncode}: "
+                        f"{decode_output(stderr, self.max_output_length)}"
                     )
-                
-                output = result.get("stdout", "")
-                if len(output) > self.max_output_length:
-                    output = output[:self.max_output_length] + "\n... (truncated)"
-                
+                )
+            
+            try:
+                result = json.loads(stdout.decode())
+            except json.JSONDecodeError:
                 return ToolResult(
-                    success=True,
-                    output=output,
-                    metadata={
-                        "stderr": result.get("stderr", ""),
-                    }
+                    success=False,
+                    output=decode_output(stdout, self.max_output_length),
+                    error="Failed to parse execution result"
                 )
-                
-            finally:
-                Path(temp_file).unlink(missing_ok=True)
-                
+            
+            return self._to_tool_result(result)
+        
         except Exception as e:
             return ToolResult(
                 success=False,
@@ -215,6 +377,70 @@ print(json.dumps(output))
                 error=str(e)
             )
     
+    async def _execute_in_worker(
+        self,
+        code: str,
+        working_dir: str | None,
+        timeout: float,
+    ) -> ToolResult:
+        """Run code in a pooled worker."""
+        # Created on first use so it belongs to the loop running the tool
+        if self._worker_slots is None:
+            self._worker_slots = asyncio.Semaphore(max(self.pool_size, 1))
+        
+        async with self._worker_slots:
+            worker = self._idle_workers.pop() if self._idle_workers else None
+            if worker is None or not worker.alive:
+                worker = await _PythonWorker.start(
+                    self.PYTHON_EXECUTABLE, self.worker_memory_limit, self.worker_cpu_limit
+                )
+            
+            try:
+                result = await asyncio.wait_for(worker.run(code, working_dir), timeout)
+            except asyncio.TimeoutError:
+                await worker.kill()
+                return ToolResult(
+                    success=False,
+                    output=None,
+                    error=f"Code execution timed out after {timeout} seconds"
+                )
+            except Exception as e:
+                await worker.kill()
+                return ToolResult(
+                    success=False,
+                    output=None,
+                    error=str(e)
+                )
+            
+            self._idle_workers.append(worker)
+            return self._to_tool_result(result)
+    
+    def _to_tool_result(self, result: dict[str, Any]) -> ToolResult:
+        """Convert a captured execution result into a ToolResult."""
+        if result.get("error"):
+            return ToolResult(
+                success=False,
+                output=result.get("stdout", ""),
+                error=result["error"]
+            )
+        
+        output = result.get("stdout", "")
+        if len(output) > self.max_output_length:
+            output = output[:self.max_output_length] + "\n... (truncated)"
+        
+        return ToolResult(
+            success=True,
+            output=output,
+            metadata={
+                "stderr": result.get("stderr", ""),
+            }
+        )
+    
+    async def close(self) -> None:
+        """Stop all idle pooled workers."""
+        while self._idle_workers:
+            await self._idle_workers.pop().kill()
+    
     def _indent_code(self, code: str, spaces: int = 4) -> str:
         """Indent code for wrapper."""
         indent = " " * spaces
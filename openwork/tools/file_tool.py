@@ -2,6 +2,10 @@
 
 from __future__ import annotations
 
+import asyncio
+import os
+import stat
+from collections import OrderedDict
 import aiofiles
 from pathlib import Path
 from typing import Any
@@ -20,11 +24,15 @@ class FileTool(BaseTool):
     - exists: Check if path exists
     - mkdir: Create directory
     - delete: Delete file or directory
+    
+    Recently read files are kept in a small LRU cache keyed on path,
+    mtime and size, so a repeat read of an unchanged file skips the disk.
     """
     
     name = "file"
     description = "Perform file system operations: read, write, list, exists, mkdir, delete"
     requires_path_check = True
+    deterministic = True
     parameters = {
         "type": "object",
         "properties": {
@@ -45,6 +53,21 @@ class FileTool(BaseTool):
         "required": ["operation", "path"]
     }
     
+    READ_ONLY_OPERATIONS = frozenset({"read", "list", "exists"})
+    
+    # Files up to this size are read in a single worker-thread call;
+    # larger ones go through aiofiles.
+    STREAM_READ_THRESHOLD = 100 * 1024 * 1024
+    
+    def __init__(self, read_cache_size: int = 64, max_cached_file_size: int = 1024 * 1024):
+        self.read_cache_size = read_cache_size
+        self.max_cached_file_size = max_cached_file_size
+        self._read_cache: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+    
+    def is_concurrency_safe(self, **kwargs: Any) -> bool:
+        """Only read-only operations may run concurrently."""
+        return kwargs.get("operation") in self.READ_ONLY_OPERATIONS
+    
     async def execute(self, **kwargs: Any) -> ToolResult:
         """Execute file operation."""
         operation = kwargs.get("operation")
@@ -88,22 +111,36 @@ class FileTool(BaseTool):
     
     async def _read(self, path: Path) -> ToolResult:
         """Read file contents."""
-        if not path.exists():
+        try:
+            st = await asyncio.to_thread(path.stat)
+        except (FileNotFoundError, NotADirectoryError):
             return ToolResult(
                 success=False,
                 output=None,
                 error=f"File not found: {path}"
             )
         
-        if not path.is_file():
+        if not stat.S_ISREG(st.st_mode):
             return ToolResult(
                 success=False,
                 output=None,
                 error=f"Not a file: {path}"
             )
         
-        async with aiofiles.open(path, "r", encoding="utf-8") as f:
-            content = await f.read()
+        cache = self._read_cache
+        key = (str(path), st.st_mtime_ns, st.st_size)
+        content = cache.get(key)
+        if content is not None:
+            cache.move_to_end(key)
+        elif st.st_size > self.STREAM_READ_THRESHOLD:
+            async with aiofiles.open(path, "r", encoding="utf-8") as f:
+                content = await f.read()
+        else:
+            content = await asyncio.to_thread(path.read_text, encoding="utf-8")
+            if st.st_size <= self.max_cached_file_size and self.read_cache_size > 0:
+                cache[key] = content
+                if len(cache) > self.read_cache_size:
+                    cache.popitem(last=False)
         
         return ToolResult(
             success=True,
@@ -113,10 +150,12 @@ class FileTool(BaseTool):
     
     async def _write(self, path: Path, content: str) -> ToolResult:
         """Write content to file."""
-        path.parent.mkdir(parents=True, exist_ok=True)
+        def write() -> None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content, encoding="utf-8")
         
-        async with aiofiles.open(path, "w", encoding="utf-8") as f:
-            await f.write(content)
+        self._forget(path)
+        await asyncio.to_thread(write)
         
         return ToolResult(
             success=True,
@@ -124,6 +163,16 @@ class FileTool(BaseTool):
             metadata={"path": str(path), "size": len(content)}
         )
     
+    def _forget(self, path: Path) -> None:
+        """Drop cached reads of a path, or of anything under it."""
+        prefix = os.path.join(str(path), "")
+        stale = [
+            key for key in self._read_cache
+            if key[0] == str(path) or key[0].startswith(prefix)
+        ]
+        for key in stale:
+            del self._read_cache[key]
+    
     async def _list(self, path: Path) -> ToolResult:
         """List directory contents."""
         if not path.exists():
@@ -140,14 +189,20 @@ class FileTool(BaseTool):
                 error=f"Not a directory: {path}"
             )
         
-        entries = []
-        for entry in path.iterdir():
-            entry_type = "dir" if entry.is_dir() else "file"
-            entries.append({
-                "name": entry.name,
-                "type": entry_type,
-                "path": str(entry),
-            })
+        def scan() -> list[dict[str, str]]:
+            # DirEntry carries the file type from the directory read, so
+            # there is no stat per entry (except for symlinks).
+            with os.scandir(path) as it:
+                return [
+                    {
+                        "name": entry.name,
+                        "type": "dir" if entry.is_dir() else "file",
+                        "path": entry.path,
+                    }
+                    for entry in it
+                ]
+        
+        entries = await asyncio.to_thread(scan)
         
         return ToolResult(
             success=True,
@@ -194,6 +249,7 @@ class FileTool(BaseTool):
                 error=f"Path not found: {path}"
             )
         
+        self._forget(path)
         if path.is_file():
             path.unlink()
             return ToolResult(
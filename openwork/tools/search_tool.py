@@ -3,13 +3,217 @@
 from __future__ import annotations
 
 import asyncio
+import fnmatch
+import mmap
+import os
 import re
+import stat
+import time
+from collections import deque
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Any
+from typing import Any, AnyStr, BinaryIO, Iterator
 
 from openwork.tools.base import BaseTool, ToolResult
 
 
+@lru_cache(maxsize=256)
+def _get_regex(pattern: str, case_sensitive: bool) -> re.Pattern:
+    """Compile a search pattern, reusing it across repeated searches."""
+    return re.compile(pattern, 0 if case_sensitive else re.IGNORECASE)
+
+
+# Escapes, negated classes, "." and "$", the tokens checked by _byte_safe
+_PATTERN_TOKEN = re.compile(r"\\.|\[\^|[.$]", re.DOTALL)
+
+# Escapes that are ASCII-only on bytes but Unicode-aware on text
+_UNICODE_ESCAPES = frozenset("wWbBsSdDZ")
+
+
+def _byte_safe(pattern: str) -> bool:
+    """
+    Check that a pattern matches the same lines in raw bytes as in text.
+    
+    ".", negated classes, and \\w, \\b, \\s, \\d and their negations work
+    per byte on bytes, so they treat a multi-byte character differently;
+    "$" and \\Z see the \\r that decoding removes from CRLF lines.
+    """
+    for token in _PATTERN_TOKEN.findall(pattern):
+        if token[0] != "\\" or token[1] in _UNICODE_ESCAPES:
+            return False
+    return True
+
+
+@lru_cache(maxsize=256)
+def _get_bytes_regex(pattern: str, case_sensitive: bool) -> re.Pattern | None:
+    """
+    Compile an ASCII search pattern for scanning undecoded file bytes.
+    
+    Returns None when the pattern is not ASCII, could match differently on
+    bytes (see _byte_safe), or is not valid as a bytes regex (e.g. uses
+    \\u escapes), in which case files are decoded first.
+    """
+    if not pattern.isascii() or not _byte_safe(pattern):
+        return None
+    try:
+        return re.compile(pattern.encode("ascii"), 0 if case_sensitive else re.IGNORECASE)
+    except re.error:
+        return None
+
+
+# Anchors and lookarounds that can see past a line break, so a whole-buffer
+# scan might miss a line that matches on its own
+_LINE_CONTEXT = re.compile(r"\\[AZz]|\(\?<?[=!]")
+
+# Patterns without regex metacharacters
+_LITERAL = re.compile(r"[^\\.^$*+?{}\[\]|()]+")
+
+# A quantified group that itself contains a quantifier, e.g. (a+)+ or
+# (.*,)*, which can backtrack exponentially
+_NESTED_QUANTIFIER = re.compile(r"\((?:[^()\\]|\\.)*[*+}](?:[^()\\]|\\.)*\)[*+{]")
+
+
+@lru_cache(maxsize=256)
+def _classify(source: str) -> str:
+    """
+    Sort a search pattern into the tier that decides how files are scanned.
+    
+    Returns:
+        "literal" for plain text, found with bytes.find; "complex" for
+        patterns prone to catastrophic backtracking, run line by line under
+        a time budget; "simple" for everything else, run as one multiline
+        scan per file.
+    """
+    if _LITERAL.fullmatch(source):
+        return "literal"
+    if _NESTED_QUANTIFIER.search(source):
+        return "complex"
+    return "simple"
+
+
+def _source(regex: re.Pattern) -> str:
+    """The pattern text of a str or ASCII bytes regex."""
+    pattern = regex.pattern
+    return pattern.decode("ascii") if isinstance(pattern, bytes) else pattern
+
+
+@lru_cache(maxsize=256)
+def _get_scanner(regex: re.Pattern) -> re.Pattern | None:
+    """Get a multiline variant of regex for scanning whole files, or None."""
+    source = _source(regex)
+    if _classify(source) == "complex" or _LINE_CONTEXT.search(source):
+        return None
+    return re.compile(regex.pattern, regex.flags | re.MULTILINE)
+
+
+@lru_cache(maxsize=256)
+def _get_literal(regex: re.Pattern) -> bytes | None:
+    """Get the text a bytes regex matches if it is a plain literal, else None."""
+    pattern = regex.pattern
+    if not isinstance(pattern, bytes) or _classify(_source(regex)) != "literal":
+        return None
+    return pattern.lower() if regex.flags & re.IGNORECASE else pattern
+
+
+def _decode_text(data: bytes) -> str:
+    """Decode file bytes the way read_text does, including universal newlines."""
+    text = data.decode("utf-8", errors="replace")
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _matching_lines(
+    content: AnyStr,
+    regex: re.Pattern,
+    deadline: float | None = None,
+) -> Iterator[tuple[int, AnyStr, int]]:
+    """
+    Find the lines of content that regex matches, one line at a time.
+    
+    Yields (line number, line, number of matches) like a per-line
+    finditer would, but locates candidate lines with a single multiline
+    search over the whole buffer instead of entering the regex engine for
+    every line. Each candidate line is then checked on its own, so matches
+    that span a line break are not reported. Plain literal patterns skip the
+    regex engine entirely and use bytes.find and bytes.count.
+    
+    content may also be an mmap, which is searched in place; only the
+    spans between matching lines are copied out to count line breaks.
+    
+    A line's trailing \r is left out, so undecoded CRLF lines match like
+    decoded ones. Complex patterns are run one line at a time, and if deadline (a
+    time.monotonic() value) passes, TimeoutError is raised between lines.
+    A single pathological line cannot be interrupted, but a file full of
+    them is abandoned.
+    """
+    mapped = isinstance(content, mmap.mmap)
+    newline, cr = (b"\n", b"\r") if mapped or isinstance(content, bytes) else ("\n", "\r")
+    if mapped:
+        def count_span(sub: bytes, start: int, end: int) -> int:
+            return content[start:end].count(sub)
+    else:
+        count_span = content.count
+    
+    needle = _get_literal(regex)
+    ignore_case = regex.flags & re.IGNORECASE
+    if needle is not None and not (mapped and ignore_case):
+        # Lowercasing bytes only folds ASCII, as re.IGNORECASE does for bytes
+        if ignore_case:
+            haystack = content.lower()
+            count_needle = haystack.count
+        else:
+            haystack = content
+            count_needle = count_span
+        
+        def find(pos: int) -> int:
+            return haystack.find(needle, pos)
+        
+        def count_in(start: int, end: int) -> int:
+            return count_needle(needle, start, end)
+    else:
+        scanner = _get_scanner(regex)
+        if scanner is None:
+            if mapped:
+                content = content[:]
+            for line_num, line in enumerate(content.split(newline), 1):
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeoutError(f"search gave up at line {line_num}")
+                if line.endswith(cr):
+                    line = line[:-1]
+                count = sum(1 for _ in regex.finditer(line))
+                if count:
+                    yield line_num, line, count
+            return
+        
+        def find(pos: int) -> int:
+            found = scanner.search(content, pos)
+            return -1 if found is None else found.start()
+        
+        def count_in(start: int, end: int) -> int:
+            return sum(1 for _ in regex.finditer(content[start:end]))
+    
+    line_num = 1
+    counted = 0
+    pos = 0
+    size = len(content)
+    while pos <= size:
+        found = find(pos)
+        if found == -1:
+            return
+        start = content.rfind(newline, 0, found) + 1
+        end = content.find(newline, found)
+        if end == -1:
+            end = size
+        line_num += count_span(newline, counted, start)
+        counted = start
+        # Undecoded CRLF lines are matched without their \r, as text is
+        line_end = end - 1 if end > start and content[end - 1:end] == cr else end
+        count = count_in(start, line_end)
+        if count:
+            yield line_num, content[start:line_end], count
+        pos = end + 1
+
+
 class SearchTool(BaseTool):
     """
     Tool for searching file contents.
@@ -23,6 +227,7 @@ class SearchTool(BaseTool):
     name = "search"
     description = "Search for content in files. Supports regex patterns and file type filtering."
     requires_path_check = True
+    deterministic = True
     parameters = {
         "type": "object",
         "properties": {
@@ -58,6 +263,23 @@ class SearchTool(BaseTool):
         "required": ["pattern", "path"]
     }
     
+    # Maximum number of files searched concurrently
+    BATCH_SIZE = min(32, (os.cpu_count() or 1) * 4)
+    
+    # Files with a NUL byte this close to the start are treated as binary
+    BINARY_PROBE_SIZE = 8192
+    
+    # Files larger than this are memory-mapped rather than read when
+    # scanned as bytes
+    MMAP_THRESHOLD = 64 * 1024
+    
+    # Files larger than this are decoded and scanned a chunk of whole lines
+    # at a time when searched as text
+    CHUNK_SIZE = 256 * 1024
+    
+    # Seconds a backtracking-prone pattern may spend on one file
+    COMPLEX_PATTERN_BUDGET = 2.0
+    
     def __init__(self, max_file_size: int = 10 * 1024 * 1024):
         self.max_file_size = max_file_size
     
@@ -77,9 +299,14 @@ class SearchTool(BaseTool):
                 error="pattern and path are required"
             )
         
-        path = Path(path_str).resolve()
+        # realpath, unlike Path.resolve(), does not stat the result itself.
+        # One stat answers both "does it exist" and "is it a file", and a
+        # single file's size is passed on so it is not stat'd again.
+        path = Path(os.path.realpath(path_str))
         
-        if not path.exists():
+        try:
+            path_stat = os.stat(path)
+        except OSError:
             return ToolResult(
                 success=False,
                 output=None,
@@ -87,8 +314,7 @@ class SearchTool(BaseTool):
             )
         
         try:
-            flags = 0 if case_sensitive else re.IGNORECASE
-            regex = re.compile(pattern, flags)
+            regex = _get_regex(pattern, bool(case_sensitive))
         except re.error as e:
             return ToolResult(
                 success=False,
@@ -96,31 +322,59 @@ class SearchTool(BaseTool):
                 error=f"Invalid regex pattern: {e}"
             )
         
+        # Scan raw bytes when possible and decode only the matching lines
+        regex = _get_bytes_regex(pattern, bool(case_sensitive)) or regex
+        
         results = []
         files_searched = 0
         
         try:
-            if path.is_file():
-                files_to_search = [path]
+            if stat.S_ISREG(path_stat.st_mode):
+                size = path_stat.st_size
+                files = iter([(str(path), size)] if size <= self.max_file_size else [])
+            elif "/" in file_pattern or os.sep in file_pattern:
+                matches = path.rglob(file_pattern) if recursive else path.glob(file_pattern)
+                files = ((str(match), None) for match in matches)
             else:
-                if recursive:
-                    files_to_search = list(path.rglob(file_pattern))
-                else:
-                    files_to_search = list(path.glob(file_pattern))
+                files = self._iter_files(str(path), file_pattern, recursive)
             
-            for file_path in files_to_search:
-                if len(results) >= max_results:
-                    break
-                
-                if not file_path.is_file():
-                    continue
-                
-                if file_path.stat().st_size > self.max_file_size:
-                    continue
+            # The tree is walked lazily, so it stops once max_results is
+            # reached. Up to BATCH_SIZE files are stat'd, read and scanned in
+            # worker threads at once, so I/O and regex work overlap. Results
+            # are taken in file order and the next file starts as soon as the
+            # oldest one is done; scans still running at the end are cancelled.
+            window: deque[asyncio.Task] = deque()
+            
+            async def take_oldest() -> None:
+                nonlocal files_searched
+                file_results = await window.popleft()
+                if file_results is not None:
+                    files_searched += 1
+                    results.extend(file_results)
+            
+            try:
+                while len(results) < max_results:
+                    batch = await asyncio.to_thread(list, islice(files, self.BATCH_SIZE))
+                    if not batch:
+                        break
+                    
+                    for file_path, size in batch:
+                        if len(window) >= self.BATCH_SIZE:
+                            await take_oldest()
+                            if len(results) >= max_results:
+                                break
+                        window.append(asyncio.create_task(asyncio.to_thread(
+                            self._search_file, file_path, regex, max_results - len(results), size
+                        )))
                 
-                files_searched += 1
-                file_results = await self._search_file(file_path, regex, max_results - len(results))
-                results.extend(file_results)
+                while window and len(results) < max_results:
+                    await take_oldest()
+            finally:
+                for task in window:
+                    task.cancel()
+                await asyncio.gather(*window, return_exceptions=True)
+            
+            del results[max_results:]
             
             return ToolResult(
                 success=True,
@@ -131,7 +385,7 @@ class SearchTool(BaseTool):
                     "truncated": len(results) >= max_results,
                 }
             )
-            
+        
         except Exception as e:
             return ToolResult(
                 success=False,
@@ -139,32 +393,151 @@ class SearchTool(BaseTool):
                 error=str(e)
             )
     
-    async def _search_file(
+    def _iter_files(self, root: str, file_pattern: str, recursive: bool) -> Iterator[tuple[str, int]]:
+        """
+        Walk root with os.walk, yielding (path, size) for each regular file
+        whose name matches file_pattern and is no larger than max_file_size.
+        
+        Each directory is listed in one pass and its file names are filtered
+        with fnmatch.filter as a batch; only the names that match are stat'd,
+        once, and _search_file reuses that size. Plain strings are passed
+        along rather than Path objects. Like rglob, symlinked directories are
+        not descended into.
+        """
+        for dirpath, dirnames, filenames in os.walk(root):
+            if not recursive:
+                dirnames.clear()
+            for name in fnmatch.filter(filenames, file_pattern):
+                file_path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(file_path)
+                except OSError:
+                    continue
+                if stat.S_ISREG(st.st_mode) and st.st_size <= self.max_file_size:
+                    yield file_path, st.st_size
+    
+    def _search_file(
         self,
-        file_path: Path,
+        file_path: str,
         regex: re.Pattern,
-        max_results: int
-    ) -> list[dict[str, Any]]:
-        """Search a single file for matches."""
+        max_results: int,
+        size: int | None = None,
+    ) -> list[dict[str, Any]] | None:
+        """
+        Search a single file for matches, as bytes if regex is a bytes pattern.
+        
+        Blocking; runs in a worker thread. size is the file size if the caller
+        already checked it; otherwise the file is stat'd here. Returns None
+        if the path is not a regular file or is larger than max_file_size.
+        Binary files, detected by a NUL byte in the first BINARY_PROBE_SIZE
+        bytes as grep does, have no matches and are not read past the probe.
+        """
+        if size is None:
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                return None
+            if not stat.S_ISREG(st.st_mode) or st.st_size > self.max_file_size:
+                return None
+            size = st.st_size
+        
         results = []
+        deadline = None
+        if _classify(_source(regex)) == "complex":
+            deadline = time.monotonic() + self.COMPLEX_PATTERN_BUDGET
+        as_bytes = isinstance(regex.pattern, bytes)
         
         try:
-            content = await asyncio.to_thread(file_path.read_text, encoding="utf-8", errors="replace")
-            
-            lines = content.split("\n")
-            for line_num, line in enumerate(lines, 1):
-                if len(results) >= max_results:
-                    break
+            with open(file_path, "rb") as f:
+                content = f.read(self.BINARY_PROBE_SIZE)
+                if b"\0" in content:
+                    return results
                 
-                matches = list(regex.finditer(line))
-                if matches:
-                    results.append({
-                        "file": str(file_path),
-                        "line": line_num,
-                        "content": line.strip()[:500],
-                        "matches": len(matches),
-                    })
+                # Large files are scanned in place through the page cache
+                # instead of being copied onto the heap
+                if as_bytes and size > self.MMAP_THRESHOLD:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        self._collect_matches(results, file_path, mapped, regex, max_results, deadline)
+                    return results
+                
+                if not as_bytes and size > self.CHUNK_SIZE:
+                    self._collect_text_chunks(results, file_path, f, content, regex, max_results, deadline)
+                    return results
+                
+                if len(content) == self.BINARY_PROBE_SIZE:
+                    content += f.read()
+            
+            if not as_bytes:
+                content = _decode_text(content)
+            
+            self._collect_matches(results, file_path, content, regex, max_results, deadline)
         except Exception:
+            # Unreadable files and files that ran out of time budget keep
+            # whatever matches were found before the failure
             pass
         
         return results
+    
+    def _collect_text_chunks(
+        self,
+        results: list[dict[str, Any]],
+        file_path: str,
+        f: BinaryIO,
+        head: bytes,
+        regex: re.Pattern,
+        max_results: int,
+        deadline: float | None,
+    ) -> None:
+        """
+        Decode and scan a file CHUNK_SIZE bytes at a time, cut at line breaks.
+        
+        Matching is per line, so cutting after a newline never splits a
+        match, and reading stops as soon as max_results is reached. Memory
+        is bounded by the chunk size plus the longest line.
+        """
+        pending = head
+        line_offset = 0
+        while len(results) < max_results:
+            chunk = f.read(self.CHUNK_SIZE)
+            data = pending + chunk
+            if chunk:
+                cut = data.rfind(b"\n") + 1
+                if not cut:
+                    pending = data
+                    continue
+                data, pending = data[:cut], data[cut:]
+            
+            text = _decode_text(data)
+            if chunk:
+                # Drop the newline ending the chunk so it adds no empty line
+                text = text[:-1]
+            self._collect_matches(
+                results, file_path, text, regex, max_results, deadline, line_offset
+            )
+            if not chunk:
+                return
+            line_offset += text.count("\n") + 1
+    
+    def _collect_matches(
+        self,
+        results: list[dict[str, Any]],
+        file_path: str,
+        content: str | bytes | mmap.mmap,
+        regex: re.Pattern,
+        max_results: int,
+        deadline: float | None = None,
+        line_offset: int = 0,
+    ) -> None:
+        """Append up to max_results matching lines of content to results."""
+        for line_num, line, count in _matching_lines(content, regex, deadline):
+            if len(results) >= max_results:
+                break
+            
+            if isinstance(line, bytes):
+                line = line.decode("utf-8", errors="replace")
+            results.append({
+                "file": file_path,
+                "line": line_offset + line_num,
+                "content": line.strip()[:500],
+                "matches": count,
+            })
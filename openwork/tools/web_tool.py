@@ -3,13 +3,52 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any
-from urllib.parse import urlparse
+import json
+from importlib.util import find_spec
+from typing import Any, Iterable
+from urllib.parse import urlsplit
 
 import httpx
 
 from openwork.tools.base import BaseTool, ToolResult
 
+try:
+    import orjson as _json
+except ImportError:
+    _json = json
+
+_HTTP2_AVAILABLE = find_spec("h2") is not None
+
+_HOST_CACHE_SIZE = 4096
+
+
+def _domain_trie(domains: Iterable[str]) -> dict:
+    """
+    Build a trie of domains keyed by their labels in reverse order.
+    
+    A None key marks the end of a listed domain, so "example.com" is stored
+    as {"com": {"example": {None: True}}}.
+    """
+    trie: dict = {}
+    for domain in domains:
+        node = trie
+        for label in reversed(domain.split(".")):
+            node = node.setdefault(label, {})
+        node[None] = True
+    return trie
+
+
+def _in_domains(trie: dict, domain: str) -> bool:
+    """Check if domain is a listed domain or a subdomain of one."""
+    node = trie
+    for label in reversed(domain.split(".")):
+        node = node.get(label)
+        if node is None:
+            return False
+        if None in node:
+            return True
+    return False
+
 
 class WebTool(BaseTool):
     """
@@ -20,6 +59,10 @@ class WebTool(BaseTool):
     - JSON and text responses
     - Custom headers
     - Timeout configuration
+    
+    Requests share one pooled client, created on first use, so keep-alive
+    connections (and HTTP/2 when h2 is installed) carry over between calls.
+    Call close() when done with the tool.
     """
     
     name = "web"
@@ -59,6 +102,8 @@ class WebTool(BaseTool):
         "required": ["url"]
     }
     
+    ALLOWED_SCHEMES = frozenset({"http", "https"})
+    
     BLOCKED_DOMAINS = [
         "localhost",
         "127.0.0.1",
@@ -75,35 +120,91 @@ class WebTool(BaseTool):
     ):
         self.default_timeout = default_timeout
         self.max_response_size = max_response_size
+        self._host_cache: dict[str, tuple[bool, str | None]] = {}
         self.allowed_domains = allowed_domains
         self.blocked_domains = blocked_domains or self.BLOCKED_DOMAINS
+        self._client: httpx.AsyncClient | None = None
+    
+    @property
+    def allowed_domains(self) -> tuple[str, ...] | None:
+        """Domains (and their subdomains) requests are limited to, if set."""
+        return self._allowed_domains
+    
+    @allowed_domains.setter
+    def allowed_domains(self, domains: list[str] | None) -> None:
+        self._allowed_domains = tuple(domains) if domains else None
+        self._allowed_trie = _domain_trie(self._allowed_domains) if domains else None
+        self._host_cache.clear()
+    
+    @property
+    def blocked_domains(self) -> tuple[str, ...]:
+        """Domains (and their subdomains) requests may never reach."""
+        return self._blocked_domains
+    
+    @blocked_domains.setter
+    def blocked_domains(self, domains: list[str]) -> None:
+        self._blocked_domains = tuple(domains)
+        self._blocked_trie = _domain_trie(self._blocked_domains)
+        self._host_cache.clear()
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the shared HTTP client, creating it if needed."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=_HTTP2_AVAILABLE,
+                timeout=self.default_timeout,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            )
+        return self._client
+    
+    async def close(self) -> None:
+        """Close the shared HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
     def _is_url_allowed(self, url: str) -> tuple[bool, str | None]:
         """Check if URL is allowed."""
         try:
-            parsed = urlparse(url)
+            parsed = urlsplit(url)
             domain = parsed.hostname or ""
             
-            if not parsed.scheme or parsed.scheme not in ["http", "https"]:
+            if parsed.scheme not in self.ALLOWED_SCHEMES:
                 return False, f"Invalid scheme: {parsed.scheme}"
             
-            for blocked in self.blocked_domains:
-                if domain == blocked or domain.endswith(f".{blocked}"):
-                    return False, f"Blocked domain: {domain}"
-            
-            if self.allowed_domains:
-                allowed = any(
-                    domain == d or domain.endswith(f".{d}")
-                    for d in self.allowed_domains
-                )
-                if not allowed:
-                    return False, f"Domain not in whitelist: {domain}"
-            
-            return True, None
-            
+            return self._check_host(domain)
+        
         except Exception as e:
             return False, f"Invalid URL: {e}"
     
+    def _check_host(self, domain: str) -> tuple[bool, str | None]:
+        """Check a host against the domain lists; cached per tool by host."""
+        result = self._host_cache.get(domain)
+        if result is not None:
+            return result
+        
+        if _in_domains(self._blocked_trie, domain):
+            result = False, f"Blocked domain: {domain}"
+        elif self._allowed_trie is not None and not _in_domains(self._allowed_trie, domain):
+            result = False, f"Domain not in whitelist: {domain}"
+        else:
+            result = True, None
+        
+        if len(self._host_cache) >= _HOST_CACHE_SIZE:
+            self._host_cache.clear()
+        self._host_cache[domain] = result
+        return result
+    
+    @staticmethod
+    def _decode_body(body: bytearray, content_type: str, encoding: str | None) -> Any:
+        """Parse a JSON response body, falling back to decoded text."""
+        if "application/json" in content_type:
+            try:
+                return _json.loads(body)
+            except ValueError:
+                pass
+        return body.decode(encoding or "utf-8", errors="replace")
+    
     async def execute(self, **kwargs: Any) -> ToolResult:
         """Execute HTTP request."""
         url = kwargs.get("url")
@@ -129,50 +230,48 @@ class WebTool(BaseTool):
             )
         
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                request_kwargs: dict[str, Any] = {
-                    "method": method,
-                    "url": url,
-                    "headers": headers,
+            client = self._get_client()
+            request_kwargs: dict[str, Any] = {
+                "method": method,
+                "url": url,
+                "headers": headers,
+                "timeout": timeout,
+            }
+            
+            if json_body is not None:
+                request_kwargs["json"] = json_body
+            elif body is not None:
+                request_kwargs["content"] = body
+            
+            # Read the body in chunks and stop as soon as it passes the cap,
+            # so an oversized response is never fully downloaded.
+            async with client.stream(**request_kwargs) as response:
+                buffer = bytearray()
+                async for chunk in response.aiter_bytes(65536):
+                    buffer += chunk
+                    if len(buffer) > self.max_response_size:
+                        return ToolResult(
+                            success=False,
+                            output=None,
+                            error=f"Response too large: more than {self.max_response_size} bytes"
+                        )
+            
+            content_length = len(buffer)
+            content_type = response.headers.get("content-type", "")
+            output = self._decode_body(buffer, content_type, response.encoding)
+            
+            return ToolResult(
+                success=response.is_success,
+                output=output,
+                error=None if response.is_success else f"HTTP {response.status_code}",
+                metadata={
+                    "status_code": response.status_code,
+                    "headers": dict(response.headers),
+                    "content_type": content_type,
+                    "content_length": content_length,
                 }
-                
-                if json_body is not None:
-                    request_kwargs["json"] = json_body
-                elif body is not None:
-                    request_kwargs["content"] = body
-                
-                response = await client.request(**request_kwargs)
-                
-                content_length = len(response.content)
-                if content_length > self.max_response_size:
-                    return ToolResult(
-                        success=False,
-                        output=None,
-                        error=f"Response too large: {content_length} bytes"
-                    )
-                
-                content_type = response.headers.get("content-type", "")
-                
-                if "application/json" in content_type:
-                    try:
-                        output = response.json()
-                    except Exception:
-                        output = response.text
-                else:
-                    output = response.text
-                
-                return ToolResult(
-                    success=response.is_success,
-                    output=output,
-                    error=None if response.is_success else f"HTTP {response.status_code}",
-                    metadata={
-                        "status_code": response.status_code,
-                        "headers": dict(response.headers),
-                        "content_type": content_type,
-                        "content_length": content_length,
-                    }
-                )
-                
+            )
+        
         except httpx.TimeoutException:
             return ToolResult(
                 success=False,
@@ -5,6 +5,7 @@ Run with: streamlit run openwork/ui/app.py
 """
 
 import asyncio
+import threading
 from pathlib import Path
 
 try:
@@ -12,6 +13,13 @@ try:
 except ImportError:
     raise ImportError("Streamlit is required for UI. Install with: pip install streamlit")
 
+from openwork.agent.loop import AgentLoop
+from openwork.llm.provider import LLMProvider, close_http_pool
+from openwork.runtime import install_uvloop
+from openwork.tools.bash_tool import BashTool
+from openwork.tools.file_tool import FileTool
+from openwork.tools.search_tool import SearchTool
+
 
 def init_session_state():
     """Initialize session state variables."""
@@ -25,6 +33,12 @@ def init_session_state():
         st.session_state.agent_loop = None
     if "llm_provider" not in st.session_state:
         st.session_state.llm_provider = None
+    if "agent_key" not in st.session_state:
+        st.session_state.agent_key = None
+    if "event_loop" not in st.session_state:
+        st.session_state.event_loop = None
+    if "loop_lock" not in st.session_state:
+        st.session_state.loop_lock = threading.Lock()
 
 
 def setup_sidebar():
@@ -69,12 +83,6 @@ def setup_agent(model: str, api_key: str):
     if not api_key:
         return None
     
-    from openwork.llm.provider import LLMProvider
-    from openwork.agent.loop import AgentLoop
-    from openwork.tools.file_tool import FileTool
-    from openwork.tools.bash_tool import BashTool
-    from openwork.tools.search_tool import SearchTool
-    
     llm = LLMProvider(model=model, api_key=api_key)
     
     tools = [
@@ -88,6 +96,65 @@ def setup_agent(model: str, api_key: str):
     return agent
 
 
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get the session's event loop.
+    
+    One loop serves every turn of a session, so the LLM's pooled
+    connections and the loop's worker threads stay warm between turns.
+    The loop is closed by close_event_loop() when the session's agent is
+    replaced. Streamlit has no session-end hook, so the loop of an
+    abandoned session is only reclaimed by garbage collection. The loop
+    is a uvloop loop when uvloop is installed.
+    """
+    loop = st.session_state.event_loop
+    if loop is None or loop.is_closed():
+        install_uvloop()
+        loop = st.session_state.event_loop = asyncio.new_event_loop()
+    return loop
+
+
+def close_event_loop() -> None:
+    """Close the session's event loop and the connections opened on it."""
+    loop = st.session_state.event_loop
+    st.session_state.event_loop = None
+    if loop is None or loop.is_closed():
+        return
+    try:
+        loop.run_until_complete(close_http_pool())
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.run_until_complete(loop.shutdown_default_executor())
+    finally:
+        loop.close()
+
+
+def run_in_session_loop(coro):
+    """
+    Run a coroutine to completion on the session's event loop.
+    
+    Overlapping reruns of a session wait their turn on the session's lock
+    rather than failing with "This event loop is already running".
+    """
+    with st.session_state.loop_lock:
+        return get_event_loop().run_until_complete(coro)
+
+
+def get_agent(model: str, api_key: str):
+    """
+    Get the session's agent, building a new one only when the settings change.
+    
+    A new agent starts on a fresh event loop; the previous loop is closed.
+    """
+    key = (model, api_key)
+    if st.session_state.agent_key != key or st.session_state.agent_loop is None:
+        if st.session_state.agent_loop is not None:
+            with st.session_state.loop_lock:
+                close_event_loop()
+        st.session_state.agent_loop = setup_agent(model, api_key)
+        st.session_state.agent_key = key
+    return st.session_state.agent_loop
+
+
 async def run_agent_task(agent, task: str, allowed_paths: list[str]):
     """Run an agent task asynchronously."""
     result = await agent.run(task, allowed_paths)
@@ -127,12 +194,12 @@ def main():
                 st.warning("Please add at least one allowed folder path in the sidebar.")
             return
         
-        agent = setup_agent(model, api_key)
+        agent = get_agent(model, api_key)
         
         with st.chat_message("assistant"):
             with st.spinner("Working on your task..."):
                 try:
-                    result = asyncio.run(
+                    result = run_in_session_loop(
                         run_agent_task(
                             agent,
                             prompt,
@@ -1,10 +1,31 @@
 """Tests for agent module."""
 
+import asyncio
+import json
+import httpx
 import pytest
 from pathlib import Path
 
 from openwork.agent.context import Context, MessageRole, Observation
+from openwork.agent.loop import AgentLoop, AgentResult
+from openwork.agent.orchestrator import TaskOrchestrator, TaskStatus
+from openwork.agent.subagent import SubagentManager
+from openwork.llm.base import BaseLLM
 from openwork.sandbox.manager import SandboxManager, SandboxConfig
+from openwork.tools.file_tool import FileTool
+
+
+class ScriptedLLM(BaseLLM):
+    """LLM that replays a fixed list of JSON decisions."""
+    
+    def __init__(self, decisions: list[dict]):
+        self.responses = [json.dumps(d) for d in decisions]
+    
+    async def generate(self, messages, **kwargs):
+        return self.responses.pop(0)
+    
+    async def generate_with_tools(self, messages, tools, **kwargs):
+        return {"content": self.responses.pop(0)}
 
 
 class TestContext:
@@ -39,6 +60,78 @@ class TestContext:
         
         assert len(ctx.observations) == 1
         assert ctx.observations[0].tool_name == "test_tool"
+        assert ctx.messages[-1].content_ref == 0
+        assert ctx.get_messages_for_llm()[-1] == {
+            "role": "tool",
+            "content": "Tool: test_tool\nOutput: result",
+        }
+    
+    def test_large_observation_truncated(self):
+        """Test that large tool output is capped in the conversation."""
+        ctx = Context(task="Test", max_tool_output_chars=100)
+        output = "a" * 50 + "b" * 1000 + "c" * 50
+        ctx.add_observation(Observation(
+            tool_name="bash",
+            input_params={},
+            output=output,
+            success=True,
+        ))
+        
+        message = ctx.get_message_content(ctx.messages[-1])
+        assert "a" * 50 in message and "c" * 50 in message
+        assert "truncated 1000 chars" in message
+        assert ctx.observations[0].output == output
+    
+    def test_observation_formatted_lazily(self):
+        """Test that tool messages are formatted from the observation when requested."""
+        ctx = Context(task="Test", max_tool_output_chars=100, keep_full_output=False)
+        output = ["x" * 500]
+        obs = Observation(tool_name="read", input_params={}, output=output, success=True)
+        ctx.add_observation(obs)
+        
+        assert obs.output is output
+        assert ctx.observations[0] is not obs
+        assert ctx._llm_tail[-1] is ctx.messages[-1]
+        assert ctx.get_dynamic_tail()[-1] == {
+            "role": "tool",
+            "content": ctx.get_message_content(ctx.messages[-1]),
+        }
+        assert "truncated" in ctx.get_messages_for_llm()[-1]["content"]
+    
+    def test_observation_formatted_once(self, monkeypatch):
+        """Test that each tool message is formatted once across iterations."""
+        ctx = Context(task="Test")
+        formatted = []
+        format_observation = ctx._format_observation
+        
+        def counting_format(observation):
+            formatted.append(observation.tool_name)
+            return format_observation(observation)
+        
+        monkeypatch.setattr(ctx, "_format_observation", counting_format)
+        for name in ["a", "b"]:
+            ctx.add_observation(Observation(tool_name=name, input_params={}, output="x", success=True))
+            ctx.get_messages_for_llm()
+            ctx.get_messages_for_llm()
+        
+        assert formatted == ["a", "b"]
+        assert ctx.get_messages_for_llm()[-1] == {"role": "tool", "content": "Tool: b\nOutput: x"}
+    
+    def test_serialized_observation_verbatim(self):
+        """Test that output with a content type is not truncated or copied."""
+        ctx = Context(task="Test", max_tool_output_chars=10, keep_full_output=False)
+        payload = json.dumps({"results": ["x" * 50]})
+        ctx.add_observation(Observation(
+            tool_name="subagent",
+            input_params={},
+            output=payload,
+            success=True,
+            content_type="application/json",
+        ))
+        
+        content = ctx.get_messages_for_llm()[-1]["content"]
+        assert content == f"Tool: subagent\nOutput: {payload}"
+        assert ctx.observations[0].output is payload
     
     def test_path_allowed(self, tmp_path):
         """Test path validation."""
@@ -51,6 +144,27 @@ class TestContext:
         assert ctx.is_path_allowed(tmp_path / "subdir")
         assert not ctx.is_path_allowed(Path("/etc"))
     
+    def test_path_allowed_sibling_prefix(self, tmp_path):
+        """Test that a sibling sharing a name prefix is not allowed."""
+        allowed = tmp_path / "data"
+        ctx = Context(task="Test", allowed_paths=[allowed])
+        
+        assert ctx.is_path_allowed(allowed / "file.txt")
+        assert not ctx.is_path_allowed(tmp_path / "data2" / "file.txt")
+    
+    def test_relative_allowed_path_follows_cwd(self, tmp_path, monkeypatch):
+        """Test that a relative allowed path resolves against the current directory."""
+        for name in ["one", "two"]:
+            (tmp_path / name).mkdir()
+        
+        monkeypatch.chdir(tmp_path / "one")
+        assert Context(task="Test", allowed_paths=["."]).is_path_allowed(tmp_path / "one")
+        
+        monkeypatch.chdir(tmp_path / "two")
+        ctx = Context(task="Test", allowed_paths=["."])
+        assert ctx.is_path_allowed(tmp_path / "two")
+        assert not ctx.is_path_allowed(tmp_path / "one")
+    
     def test_get_messages_for_llm(self):
         """Test getting messages formatted for LLM."""
         ctx = Context(task="Test task")
@@ -62,6 +176,17 @@ class TestContext:
         assert messages[0]["role"] == "user"
         assert messages[1]["role"] == "assistant"
     
+    def test_system_prefix_first(self):
+        """Test that system messages are emitted before the conversation."""
+        ctx = Context(task="Test task")
+        ctx.add_message(MessageRole.SYSTEM, "System prompt")
+        ctx.add_message(MessageRole.ASSISTANT, "Response")
+        
+        messages = ctx.get_messages_for_llm()
+        
+        assert [m["role"] for m in messages] == ["system", "user", "assistant"]
+        assert ctx.get_static_prefix() == [{"role": "system", "content": "System prompt"}]
+    
     def test_trim_history(self):
         """Test that history is trimmed when exceeding max length."""
         ctx = Context(task="Test", max_history_length=5)
@@ -70,6 +195,338 @@ class TestContext:
             ctx.add_message(MessageRole.ASSISTANT, f"Message {i}")
         
         assert len(ctx.messages) <= 5
+    
+    def test_trim_keeps_system_messages(self):
+        """Test that system messages are never evicted by trimming."""
+        ctx = Context(task="Test", max_history_length=3)
+        ctx.add_message(MessageRole.SYSTEM, "System prompt")
+        
+        for i in range(10):
+            ctx.add_message(MessageRole.ASSISTANT, f"Message {i}")
+        
+        messages = ctx.get_messages_for_llm()
+        assert messages[0] == {"role": "system", "content": "System prompt"}
+        assert [m["content"] for m in messages[1:]] == ["Message 7", "Message 8", "Message 9"]
+
+
+class TestAgentLoop:
+    """Tests for AgentLoop."""
+    
+    @pytest.mark.asyncio
+    async def test_multiple_tool_calls(self, tmp_path):
+        """Test that a decision with several tool calls runs them all in order."""
+        (tmp_path / "a.txt").write_text("alpha")
+        (tmp_path / "b.txt").write_text("beta")
+        llm = ScriptedLLM([
+            {
+                "thought": "read both",
+                "tools": [
+                    {"tool": "file", "params": {"operation": "read", "path": str(tmp_path / "a.txt")}},
+                    {"tool": "file", "params": {"operation": "read", "path": str(tmp_path / "b.txt")}},
+                ],
+            },
+            {"thought": "done", "is_complete": True, "answer": "ok"},
+        ])
+        agent = AgentLoop(llm=llm, tools=[FileTool()])
+        
+        result = await agent.run("read files", [str(tmp_path)])
+        
+        assert result.success
+        assert [obs.output for obs in result.observations] == ["alpha", "beta"]
+    
+    @pytest.mark.asyncio
+    async def test_unknown_params_filtered(self, tmp_path):
+        """Test that params outside a tool's schema are dropped."""
+        agent = AgentLoop(llm=ScriptedLLM([]), tools=[FileTool()])
+        ctx = Context(task="Test", allowed_paths=[tmp_path])
+        
+        result = await agent._execute_tool(
+            "file",
+            {"operation": "exists", "path": str(tmp_path), "bogus": 1},
+            ctx,
+        )
+        
+        assert result.success
+        assert agent._tool_params["file"] == {"operation", "path", "content"}
+    
+    @pytest.mark.asyncio
+    async def test_repeated_read_reused_until_write(self, tmp_path):
+        """Test that identical reads are served from the run cache."""
+        path = tmp_path / "a.txt"
+        path.write_text("one")
+        agent = AgentLoop(llm=ScriptedLLM([]), tools=[FileTool()])
+        ctx = Context(task="Test", allowed_paths=[tmp_path])
+        read = {"operation": "read", "path": str(path)}
+        
+        first = await agent._execute_tool("file", read, ctx)
+        path.write_text("two")
+        second = await agent._execute_tool("file", read, ctx)
+        await agent._execute_tool(
+            "file", {"operation": "write", "path": str(path), "content": "three"}, ctx
+        )
+        third = await agent._execute_tool("file", read, ctx)
+        
+        assert first.output == second.output == "one"
+        assert third.output == "three"
+    
+    def test_write_is_not_concurrency_safe(self):
+        """Test that destructive file operations stay on the serial path."""
+        tool = FileTool()
+        
+        assert tool.is_concurrency_safe(operation="read")
+        assert not tool.is_concurrency_safe(operation="write")
+    
+    @pytest.mark.asyncio
+    async def test_tool_without_concurrency_check_runs_serially(self):
+        """Test that duck-typed tools lacking is_concurrency_safe still run."""
+        from openwork.tools.base import ToolResult
+        from openwork.tools.bash_tool import BashTool
+        from openwork.tools.code_tool import CodeTool
+        
+        class PlainTool:
+            name = "plain"
+            description = "No concurrency check"
+            parameters = {"type": "object", "properties": {}}
+            
+            async def execute(self, **kwargs):
+                return ToolResult(success=True, output="ok")
+        
+        agent = AgentLoop(llm=ScriptedLLM([]), tools=[PlainTool()])
+        results = await agent._execute_tool_calls(
+            [{"name": "plain", "params": {}}, {"name": "plain", "params": {}}],
+            Context(task="Test"),
+        )
+        
+        assert [r.output for r in results] == ["ok", "ok"]
+        assert not BashTool().is_concurrency_safe(command="ls")
+        assert not CodeTool().is_concurrency_safe(code="1")
+
+
+class EchoAgent:
+    """Agent loop stand-in that completes every task immediately."""
+    
+    def __init__(self):
+        self.tasks = []
+    
+    async def run(self, task, allowed_paths=None):
+        self.tasks.append(task)
+        return AgentResult(success=True, output=task)
+
+
+class TestTaskOrchestrator:
+    """Tests for TaskOrchestrator."""
+    
+    @pytest.mark.asyncio
+    async def test_worker_processes_and_stops(self):
+        """Test that queued tasks run and stop() returns promptly."""
+        orchestrator = TaskOrchestrator()
+        agent = EchoAgent()
+        orchestrator.set_agent_loop(agent)
+        await orchestrator.start()
+        
+        task = orchestrator.create_task("hello", [])
+        await orchestrator.submit_task(task)
+        await asyncio.wait_for(orchestrator.task_queue.join(), timeout=1)
+        await asyncio.wait_for(orchestrator.stop(), timeout=1)
+        
+        assert task.status == TaskStatus.COMPLETED
+        assert agent.tasks == ["hello"]
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_tasks(self):
+        """Test that up to max_concurrent_tasks run at the same time."""
+        orchestrator = TaskOrchestrator(max_concurrent_tasks=3)
+        release = asyncio.Event()
+        peak = 0
+        
+        class BlockingAgent:
+            async def run(self, task, allowed_paths=None):
+                nonlocal peak
+                peak = max(peak, orchestrator.in_flight)
+                await release.wait()
+                return AgentResult(success=True, output=task)
+        
+        orchestrator.set_agent_loop(BlockingAgent())
+        await orchestrator.start()
+        for i in range(3):
+            await orchestrator.submit_task(orchestrator.create_task(f"t{i}", []))
+        
+        await asyncio.sleep(0.05)
+        assert orchestrator.in_flight == 3
+        release.set()
+        await asyncio.wait_for(orchestrator.task_queue.join(), timeout=1)
+        await orchestrator.stop()
+        
+        assert peak == 3
+        assert all(t.status == TaskStatus.COMPLETED for t in orchestrator.get_all_tasks())
+    
+    @pytest.mark.asyncio
+    async def test_stop_cancels_in_flight_tasks(self):
+        """Test that stop() cancels running tasks once the grace period ends."""
+        orchestrator = TaskOrchestrator()
+        
+        class HangingAgent:
+            async def run(self, task, allowed_paths=None):
+                await asyncio.Event().wait()
+        
+        orchestrator.set_agent_loop(HangingAgent())
+        await orchestrator.start()
+        task = orchestrator.create_task("hang", [])
+        await orchestrator.submit_task(task)
+        await asyncio.sleep(0.01)
+        await asyncio.wait_for(orchestrator.stop(grace=0.05), timeout=1)
+        
+        assert task.status == TaskStatus.CANCELLED
+        assert orchestrator._workers == []
+    
+    @pytest.mark.asyncio
+    async def test_workers_use_separate_agent_loops(self):
+        """Test that each worker runs on its own clone of the agent loop."""
+        llm = ScriptedLLM([])
+        agent = AgentLoop(llm=llm, tools=[FileTool()])
+        agent.add_callback(lambda event, data: None)
+        orchestrator = TaskOrchestrator(max_concurrent_tasks=2)
+        orchestrator.set_agent_loop(agent)
+        
+        loops = [orchestrator._worker_loop(i) for i in range(2)]
+        
+        assert loops[0] is agent
+        assert loops[1] is not agent
+        assert loops[1].tools is agent.tools
+        assert loops[1]._sync_callbacks == agent._sync_callbacks
+        assert loops[1]._sync_callbacks is not agent._sync_callbacks
+
+
+class TestSubagentManager:
+    """Tests for SubagentManager."""
+    
+    @pytest.mark.asyncio
+    async def test_execute_parallel_bounded(self):
+        """Test that no more than max_concurrent subagents run at once."""
+        active = 0
+        peak = 0
+        
+        class SlowLLM(BaseLLM):
+            async def generate(self, messages, **kwargs):
+                nonlocal active, peak
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+                return json.dumps({"thought": "done", "is_complete": True, "answer": "ok"})
+            
+            async def generate_with_tools(self, messages, tools, **kwargs):
+                return {"content": await self.generate(messages)}
+        
+        manager = SubagentManager(AgentLoop(llm=SlowLLM(), tools=[]), max_concurrent=2)
+        results = await manager.spawn_and_wait(
+            [{"description": f"task {i}"} for i in range(6)],
+            allowed_paths=[],
+        )
+        
+        assert peak == 2
+        assert len(results) == 6
+        assert all(r.success for r in results)
+        assert len(manager._loop_pool) == 2
+    
+    @pytest.mark.asyncio
+    async def test_iter_parallel_completion_order(self):
+        """Test that results stream in as subagents finish."""
+        class DelayLLM(BaseLLM):
+            async def generate(self, messages, **kwargs):
+                task = messages[-1]["content"]
+                await asyncio.sleep(0.05 if "slow" in task else 0)
+                return json.dumps({"thought": "done", "is_complete": True, "answer": task})
+            
+            async def generate_with_tools(self, messages, tools, **kwargs):
+                return {"content": await self.generate(messages)}
+        
+        manager = SubagentManager(AgentLoop(llm=DelayLLM(), tools=[]))
+        tasks = [manager.create_task("slow", []), manager.create_task("fast", [])]
+        
+        streamed = [r.task_id async for r in manager.iter_parallel(tasks)]
+        ordered = await manager.execute_parallel(tasks)
+        
+        assert streamed == [tasks[1].id, tasks[0].id]
+        assert [r.task_id for r in ordered] == [tasks[0].id, tasks[1].id]
+    
+    @pytest.mark.asyncio
+    async def test_subagent_tool_returns_json(self):
+        """Test that the tool output is serialized JSON in input order."""
+        from openwork.agent.subagent import SubagentTool
+        
+        llm = ScriptedLLM([
+            {"thought": "done", "is_complete": True, "answer": "one"},
+            {"thought": "done", "is_complete": True, "answer": "two"},
+        ])
+        tool = SubagentTool(SubagentManager(AgentLoop(llm=llm, tools=[])), [])
+        
+        result = await tool.execute(subtasks=[{"description": "a"}, {"description": "b"}])
+        output = json.loads(result.output)
+        
+        assert result.content_type == "application/json"
+        assert output["successful"] == 2
+        assert [r["summary"] for r in output["results"]] == ["Completed: one", "Completed: two"]
+    
+    def test_task_ids_unique(self):
+        """Test that counter-based task ids are unique per manager."""
+        manager = SubagentManager(AgentLoop(llm=ScriptedLLM([]), tools=[]))
+        
+        ids = {manager.create_task(f"task {i}", []).id for i in range(50)}
+        
+        assert len(ids) == 50
+    
+    @pytest.mark.asyncio
+    async def test_task_timestamps(self):
+        """Test that task timestamps convert to datetimes."""
+        llm = ScriptedLLM([{"thought": "done", "is_complete": True, "answer": "ok"}])
+        manager = SubagentManager(AgentLoop(llm=llm, tools=[]))
+        task = manager.create_task("work", [])
+        
+        assert task.completed_at_dt is None
+        await manager.execute_task(task)
+        
+        assert task.completed_at >= task.created_at
+        assert task.completed_at_dt >= task.created_at_dt
+    
+    @pytest.mark.asyncio
+    async def test_long_output_summarized_with_reference(self):
+        """Test that long outputs are summarized and kept for fetching."""
+        long_answer = "x" * 1000
+        llm = ScriptedLLM([
+            {"thought": "done", "is_complete": True, "answer": long_answer},
+        ])
+        llm.responses.append("Short summary.")
+        manager = SubagentManager(AgentLoop(llm=llm, tools=[]))
+        
+        [result] = await manager.spawn_and_wait([{"description": "work"}], [])
+        
+        assert result.summary == f"Completed: [ref:{result.task_id}] Short summary."
+        assert manager.fetch_full(result.task_id) == long_answer
+        assert manager.inline_runs == 1
+    
+    @pytest.mark.asyncio
+    async def test_output_store_bounded(self):
+        """Test that only summarized outputs are kept, up to the store limit."""
+        from openwork.agent.subagent import create_subagent_tools
+        
+        llm = ScriptedLLM([
+            {"thought": "done", "is_complete": True, "answer": answer}
+            for answer in ["short", "a" * 600, "b" * 600]
+        ])
+        llm.responses[2:2] = ["Summary a."]
+        llm.responses.append("Summary b.")
+        manager = SubagentManager(AgentLoop(llm=llm, tools=[]), max_stored_outputs=1)
+        spawn, fetch = create_subagent_tools(manager, [])
+        
+        results = []
+        for _ in range(3):
+            results += await manager.spawn_and_wait([{"description": "work"}], [])
+        
+        assert list(manager.full_outputs) == [results[2].task_id]
+        assert (await fetch.execute(task_id=results[2].task_id)).output == "b" * 600
+        assert not (await fetch.execute(task_id=results[0].task_id)).success
+        assert {spawn.name, fetch.name} == {"spawn_subagent", "fetch_subagent_output"}
 
 
 class TestSandboxManager:
@@ -91,6 +548,39 @@ class TestSandboxManager:
         assert manager.is_path_allowed(tmp_path / "subdir" / "file.txt")
         assert not manager.is_path_allowed(Path("/etc/passwd"))
     
+    def test_is_path_allowed_many_roots(self, tmp_path):
+        """Test containment with nested and sibling allowed roots."""
+        manager = SandboxManager()
+        for name in ["a", "a/b", "ab", "c"]:
+            manager.add_allowed_path(tmp_path / name)
+        
+        assert manager.is_path_allowed(tmp_path / "a" / "x" / "file.txt")
+        assert manager.is_path_allowed(tmp_path / "ab" / "file.txt")
+        assert manager.is_path_allowed(tmp_path)
+        assert not manager.is_path_allowed(tmp_path / "b" / "file.txt")
+        assert not manager.is_path_allowed(tmp_path / "a-b")
+        
+        manager.remove_allowed_path(tmp_path / "c")
+        assert not manager.is_path_allowed(tmp_path / "c" / "file.txt")
+    
+    def test_symlink_retarget_rechecked(self, tmp_path):
+        """Test a symlink retargeted after a check is resolved again."""
+        manager = SandboxManager()
+        manager.add_allowed_path(tmp_path / "root")
+        (tmp_path / "root").mkdir()
+        (tmp_path / "root" / "inside.txt").write_text("ok")
+        (tmp_path / "secret.txt").write_text("secret")
+        link = tmp_path / "root" / "link.txt"
+        link.symlink_to(tmp_path / "root" / "inside.txt")
+        
+        assert manager.validate_path(link) == (True, None)
+        
+        link.unlink()
+        link.symlink_to(tmp_path / "secret.txt")
+        assert not manager.is_path_allowed(link)
+        assert not manager.validate_path(link)[0]
+        assert not manager.validate_paths_batch([link])[0][0]
+    
     def test_extension_validation(self):
         """Test file extension validation."""
         manager = SandboxManager()
@@ -98,6 +588,33 @@ class TestSandboxManager:
         assert manager.is_extension_allowed(Path("file.txt"))
         assert manager.is_extension_allowed(Path("script.py"))
         assert not manager.is_extension_allowed(Path("program.exe"))
+        assert not manager.is_extension_allowed("dir.txt/PROGRAM.EXE")
+        assert manager.is_extension_allowed("dir.exe/Makefile")
+        assert manager.is_extension_allowed(".bashrc")
+    
+    def test_validate_paths_batch(self, tmp_path):
+        """Test that batch validation matches per-path validation."""
+        manager = SandboxManager(SandboxConfig(max_file_size=10))
+        manager.add_allowed_path(tmp_path / "ok")
+        (tmp_path / "ok").mkdir()
+        (tmp_path / "ok" / "a.txt").write_text("a")
+        (tmp_path / "ok" / "b.exe").write_text("b")
+        (tmp_path / "ok" / "big.txt").write_text("x" * 20)
+        (tmp_path / "ok" / "single").mkdir()
+        (tmp_path / "ok" / "single" / "c.txt").write_text("c")
+        paths = [
+            tmp_path / "ok" / "a.txt",
+            tmp_path / "ok" / "b.exe",
+            tmp_path / "ok" / "big.txt",
+            tmp_path / "ok" / "missing.txt",
+            tmp_path / "ok" / "single" / "c.txt",
+            tmp_path / "outside.txt",
+        ]
+        
+        batch = manager.validate_paths_batch(paths)
+        
+        assert batch == [manager.validate_path(p) for p in paths]
+        assert [ok for ok, _ in batch] == [True, False, False, True, True, False]
     
     def test_validate_path(self, tmp_path):
         """Test full path validation."""
@@ -125,3 +642,59 @@ class TestSandboxManager:
         assert "allowed_paths" in status
         assert str(tmp_path.resolve()) in status["allowed_paths"]
         assert "docker_available" in status
+    
+    @pytest.mark.asyncio
+    async def test_docker_reuses_container(self, monkeypatch):
+        """Test that docker commands exec into one persistent container."""
+        from openwork.sandbox import manager as sandbox_module
+        
+        commands = []
+        
+        async def fake_run_process(args, timeout):
+            commands.append(args[:2])
+            return 0, b"container-id\n" if args[1] == "run" else b"ok", b""
+        
+        async def no_api(*args):
+            raise httpx.ConnectError("socket unavailable")
+        
+        monkeypatch.setattr(sandbox_module, "_run_process", fake_run_process)
+        monkeypatch.setattr(sandbox_module.DockerSandbox, "_exec_api", no_api)
+        monkeypatch.setattr(sandbox_module.shutil, "which", lambda name: "/usr/bin/docker")
+        manager = SandboxManager()
+        
+        assert await manager.run_in_docker("echo 1") == (True, "ok", "")
+        assert await manager.run_in_docker("echo 2") == (True, "ok", "")
+        await manager.close()
+        
+        assert commands == [
+            ["docker", "run"],
+            ["docker", "exec"],
+            ["docker", "exec"],
+            ["docker", "rm"],
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_docker_exec_over_api(self):
+        """Test that execs use the Engine API and demultiplex output."""
+        from openwork.sandbox.manager import DockerSandbox
+        
+        def frame(stream: int, data: bytes) -> bytes:
+            return bytes([stream, 0, 0, 0]) + len(data).to_bytes(4, "big") + data
+        
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/containers/cid/exec":
+                return httpx.Response(201, json={"Id": "eid"})
+            if request.url.path == "/exec/eid/start":
+                return httpx.Response(200, content=frame(1, b"out") + frame(2, b"err"))
+            return httpx.Response(200, json={"ExitCode": 0})
+        
+        sandbox = DockerSandbox()
+        sandbox._use_api = True
+        sandbox._api = httpx.AsyncClient(
+            transport=httpx.MockTransport(handler), base_url="http://docker"
+        )
+        
+        result = await sandbox._exec("cid", ["sh", "-c", "true"], None, 5)
+        await sandbox.close()
+        
+        assert result == (0, b"out", b"err")
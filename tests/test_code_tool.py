@@ -48,6 +48,27 @@ print(x + y)
         assert not result.success
         assert "Blocked" in result.error
     
+    def test_safety_check_uses_syntax(self):
+        """Test blocking is decided on imports and calls, not substrings."""
+        tool = CodeTool()
+        
+        assert tool._is_code_safe("import osmium")[0]
+        assert tool._is_code_safe("text = 'import os'")[0]
+        assert tool._is_code_safe("evaluate = 1")[0]
+        assert tool._is_code_safe("import os.path") == (False, "Blocked import: os.path")
+        assert tool._is_code_safe("from shutil import rmtree") == (False, "Blocked import: shutil")
+        assert tool._is_code_safe("x = eval('1')") == (False, "Blocked call: eval()")
+        assert not tool._is_code_safe("print(__builtins__)")[0]
+    
+    def test_blocked_imports_extendable(self):
+        """Test BLOCKED_IMPORTS can be extended, including with dotted names."""
+        tool = CodeTool()
+        tool.BLOCKED_IMPORTS = [*CodeTool.BLOCKED_IMPORTS, "socket", "json.decoder"]
+        
+        assert tool._is_code_safe("import socket") == (False, "Blocked import: socket")
+        assert tool._is_code_safe("from json import decoder") == (False, "Blocked import: json.decoder")
+        assert tool._is_code_safe("import json")[0]
+    
     @pytest.mark.asyncio
     async def test_timeout(self):
         """Test code execution timeout."""
@@ -78,3 +99,84 @@ print("done")
         result = await tool.execute()
         assert not result.success
         assert "required" in result.error.lower()
+    
+    @pytest.mark.asyncio
+    async def test_worker_pool_reuses_interpreter(self, tmp_path):
+        """Test that pooled execution reuses one worker with fresh globals."""
+        tool = CodeTool(pool_size=1)
+        
+        first = await tool.execute(code="x = 1\nprint(x)")
+        worker = tool._idle_workers[0]
+        second = await tool.execute(
+            code="try:\n    print(x)\nexcept NameError:\n    print('fresh')",
+            working_dir=str(tmp_path),
+        )
+        failed = await tool.execute(code="raise ValueError('bad')")
+        await tool.close()
+        
+        assert first.success and first.output == "1\n"
+        assert second.output == "fresh\n"
+        assert failed.error == "bad"
+        assert worker.process.returncode is not None
+    
+    @pytest.mark.asyncio
+    async def test_worker_pool_timeout(self):
+        """Test that a timed-out worker is killed and replaced."""
+        tool = CodeTool(pool_size=1)
+        assert tool._worker_slots is None
+        
+        result = await tool.execute(code="while True: pass", timeout=0.5)
+        after = await tool.execute(code="print('ok')")
+        await tool.close()
+        
+        assert not result.success
+        assert "timed out" in result.error
+        assert after.output == "ok\n"
+    
+    @pytest.mark.asyncio
+    async def test_worker_pool_resource_limits(self):
+        """Test that pooled workers are capped in memory and CPU time."""
+        pytest.importorskip("resource")
+        tool = CodeTool(pool_size=1, worker_memory_limit=512 * 1024 * 1024, worker_cpu_limit=1)
+        
+        memory = await tool.execute(code="data = bytearray(1024 * 1024 * 1024)")
+        cpu = await tool.execute(code="while True: pass", timeout=10)
+        after = await tool.execute(code="print('ok')")
+        await tool.close()
+        
+        assert not memory.success
+        assert not cpu.success
+        assert "timed out" not in cpu.error
+        assert after.output == "ok\n"
+    
+    @pytest.mark.asyncio
+    async def test_large_code_sent_over_stdin(self):
+        """Test that code past the argv limit still runs."""
+        tool = CodeTool()
+        tool.MAX_ARGV_CODE_LENGTH = 10
+        
+        result = await tool.execute(code="print('via stdin')")
+        assert result.success
+        assert result.output == "via stdin\n"
+    
+    @pytest.mark.asyncio
+    async def test_argv_limit_counts_bytes(self, monkeypatch):
+        """Test that non-ASCII code is measured in bytes against the argv limit."""
+        import asyncio
+        
+        tool = CodeTool()
+        code = "# " + "é" * 400 + "\nprint('ok')"
+        tool.MAX_ARGV_CODE_LENGTH = len(tool._indent_code(code)) + 600
+        
+        calls = []
+        spawn = asyncio.create_subprocess_exec
+        
+        async def recording_spawn(*args, **kwargs):
+            calls.append(args)
+            return await spawn(*args, **kwargs)
+        
+        monkeypatch.setattr(asyncio, "create_subprocess_exec", recording_spawn)
+        result = await tool.execute(code=code)
+        
+        assert result.output == "ok\n"
+        assert calls[-1] == (tool.PYTHON_EXECUTABLE, "-")
@@ -0,0 +1,190 @@
+"""Tests for LLM module."""
+
+import pytest
+
+from openwork.agent.loop import AgentLoop
+from openwork.llm.base import BaseLLM
+from openwork.llm.cache import LLMCache
+from openwork.llm.provider import LLMProvider
+
+
+class FakeLLM(BaseLLM):
+    """LLM that returns a fixed response and counts calls."""
+    
+    def __init__(self, response: str, temperature: float = 0):
+        self.response = response
+        self.temperature = temperature
+        self.model = "fake"
+        self.calls = 0
+    
+    async def generate(self, messages, **kwargs):
+        self.calls += 1
+        return self.response
+    
+    async def generate_with_tools(self, messages, tools, **kwargs):
+        self.calls += 1
+        return {"content": self.response}
+
+
+class TestLLMCache:
+    """Tests for LLMCache."""
+    
+    def test_cache_key_stable(self):
+        """Test that equal requests produce equal keys."""
+        messages = [{"role": "user", "content": "hi"}]
+        key1 = LLMCache.cache_key("gpt-4", messages, ["file"])
+        key2 = LLMCache.cache_key("gpt-4", list(messages), ["file"])
+        
+        assert key1 == key2
+        assert key1 != LLMCache.cache_key("gpt-3.5", messages, ["file"])
+    
+    @pytest.mark.asyncio
+    async def test_get_set(self):
+        """Test exact hits and misses are recorded."""
+        cache = LLMCache()
+        
+        assert await cache.get("key") is None
+        await cache.set("key", "value")
+        assert await cache.get("key") == "value"
+        assert cache.stats == {"hits": 1, "misses": 1}
+    
+    @pytest.mark.asyncio
+    async def test_semantic_lookup(self):
+        """Test near-duplicate final messages reuse a response."""
+        async def embed(text: str) -> list[float]:
+            return [1.0, 0.0] if "files" in text else [0.0, 1.0]
+        
+        cache = LLMCache(embed=embed)
+        first = [{"role": "user", "content": "list files"}]
+        await cache.set("a", "cached", first)
+        
+        similar = [{"role": "user", "content": "list the files"}]
+        other = [{"role": "user", "content": "weather"}]
+        assert await cache.get("b", similar) == "cached"
+        assert await cache.get("c", other) is None
+    
+    @pytest.mark.asyncio
+    async def test_agent_loop_uses_cache(self):
+        """Test that a repeated run is served from the cache."""
+        llm = FakeLLM('{"thought": "done", "is_complete": true, "answer": "ok"}')
+        agent = AgentLoop(llm=llm, tools=[], cache=LLMCache())
+        
+        await agent.run("task")
+        result = await agent.run("task")
+        
+        assert result.success
+        assert llm.calls == 1
+        assert agent.cache.stats["hits"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_agent_loop_skips_cache_when_sampling(self):
+        """Test that non-deterministic settings bypass the cache."""
+        llm = FakeLLM('{"thought": "done", "is_complete": true}', temperature=0.7)
+        agent = AgentLoop(llm=llm, tools=[], cache=LLMCache())
+        
+        await agent.run("task")
+        await agent.run("task")
+        
+        assert llm.calls == 2
+
+
+class TestPromptCaching:
+    """Tests for provider-native prompt caching."""
+    
+    MESSAGES = [
+        {"role": "system", "content": "static"},
+        {"role": "user", "content": "dynamic"},
+    ]
+    
+    def test_anthropic_cache_control(self):
+        """Test that the system prefix gets a cache_control breakpoint."""
+        llm = LLMProvider(model="claude-sonnet")
+        
+        messages, kwargs = llm._apply_prompt_caching(self.MESSAGES)
+        
+        assert kwargs == {}
+        assert messages[0]["content"][0]["cache_control"] == {"type": "ephemeral"}
+        assert messages[1] == self.MESSAGES[1]
+    
+    def test_openai_prompt_cache_key(self):
+        """Test that the cache key only depends on the prefix."""
+        llm = LLMProvider(model="gpt-4")
+        
+        messages, kwargs = llm._apply_prompt_caching(self.MESSAGES)
+        _, other = llm._apply_prompt_caching(
+            [self.MESSAGES[0], {"role": "user", "content": "else"}]
+        )
+        
+        assert messages == self.MESSAGES
+        assert kwargs["prompt_cache_key"] == other["prompt_cache_key"]
+    
+    def test_cache_key_only_for_openai_models(self):
+        """Test that bare non-OpenAI model names get no cache arguments."""
+        for model in ["gpt-4o", "o3-mini", "openai/gpt-4o"]:
+            assert LLMProvider(model=model)._cache_style == "openai"
+        for model in ["my-azure-deployment", "mistral-large", "ollama/llama2"]:
+            llm = LLMProvider(model=model)
+            assert llm._apply_prompt_caching(self.MESSAGES) == (self.MESSAGES, {})
+    
+    def test_explicit_prompt_cache_key(self):
+        """Test that a shared key overrides the derived one."""
+        llm = LLMProvider(model="gpt-4")
+        
+        _, kwargs = llm._apply_prompt_caching(self.MESSAGES, "shared")
+        
+        assert kwargs == {"prompt_cache_key": "shared"}
+    
+    def test_http_client_installed_once(self, monkeypatch):
+        """Test that every provider shares one client and a set session is kept."""
+        from openwork.llm import provider
+        
+        monkeypatch.setattr(provider, "_http_client", None)
+        litellm = type("litellm", (), {"aclient_session": None})
+        
+        provider._install_http_client(litellm)
+        client = litellm.aclient_session
+        provider._install_http_client(litellm)
+        assert litellm.aclient_session is client
+        
+        other = type("litellm", (), {"aclient_session": "custom"})
+        provider._install_http_client(other)
+        assert other.aclient_session == "custom"
+    
+    def test_http_pool_per_event_loop(self):
+        """Test that each event loop gets its own connection pool."""
+        import asyncio
+        import httpx
+        from openwork.llm.provider import _LoopPools
+        
+        created = []
+        
+        def factory():
+            transport = httpx.MockTransport(lambda request: httpx.Response(200, text="ok"))
+            created.append(transport)
+            return transport
+        
+        client = httpx.AsyncClient(transport=_LoopPools(factory))
+        
+        async def fetch_twice():
+            await client.get("https://example.com/")
+            await client.get("https://example.com/")
+        
+        asyncio.run(fetch_twice())
+        asyncio.run(fetch_twice())
+        assert len(created) == 2
+    
+    def test_parse_arguments(self):
+        """Test tool-call argument decoding."""
+        assert LLMProvider.parse_arguments('{"path": "a.txt"}') == {"path": "a.txt"}
+        assert LLMProvider.parse_arguments({"path": "a.txt"}) == {"path": "a.txt"}
+        assert LLMProvider.parse_arguments("not json") == {}
+        assert LLMProvider.parse_arguments("[1]") == {}
+        assert LLMProvider.parse_arguments(None) == {}
+    
+    def test_request_kwargs(self):
+        """Test that per-call overrides do not modify the base arguments."""
+        llm = LLMProvider(model="gpt-4", temperature=0.2)
+        
+        assert llm._request_kwargs({}) is llm._base_kwargs
+        assert llm._request_kwargs({"max_tokens": 1})["max_tokens"] == 1
+        assert llm._base_kwargs["max_tokens"] == 4096
@@ -1,5 +1,6 @@
 """Tests for tools module."""
 
+import os
 import pytest
 import tempfile
 from pathlib import Path
@@ -75,6 +76,42 @@ class TestFileTool:
         )
         assert result.success
         assert result.output["exists"] is False
+    
+    @pytest.mark.asyncio
+    async def test_read_cache(self, temp_dir, monkeypatch):
+        """Test repeat reads are cached until the file changes."""
+        tool = FileTool()
+        test_file = temp_dir / "cached.txt"
+        test_file.write_text("first")
+        
+        result = await tool.execute(operation="read", path=str(test_file))
+        assert result.output == "first"
+        
+        def fail(*args, **kwargs):
+            raise AssertionError("read_text called on a cache hit")
+        
+        with monkeypatch.context() as m:
+            m.setattr(Path, "read_text", fail)
+            result = await tool.execute(operation="read", path=str(test_file))
+        assert result.output == "first"
+        
+        await tool.execute(operation="write", path=str(test_file), content="second!")
+        result = await tool.execute(operation="read", path=str(test_file))
+        assert result.output == "second!"
+        assert len(tool._read_cache) == 1
+
+
+class TestToolSchema:
+    """Tests for tool schemas."""
+    
+    def test_schema_built_once(self):
+        """Test that the schema is cached per instance."""
+        import json
+        tool = FileTool()
+        
+        assert tool.to_schema() is tool.to_schema()
+        assert tool.to_schema()["function"]["name"] == "file"
+        assert json.loads(tool.to_schema_bytes()) == tool.to_schema()
 
 
 class TestBashTool:
@@ -98,6 +135,60 @@ class TestBashTool:
         assert not result.success
         assert "Blocked" in result.error or "Dangerous" in result.error
     
+    def test_safety_patterns_case_insensitive(self):
+        """Test that block patterns match regardless of case."""
+        tool = BashTool()
+        
+        assert tool._is_command_safe("SUDO ls")[1] == "Blocked command pattern: sudo"
+        assert tool._is_command_safe("chmod -R 777 /")[1] == (
+            "Dangerous command pattern detected: chmod -R 777 /"
+        )
+        assert tool._is_command_safe("ls -la") == (True, None)
+    
+    @pytest.mark.asyncio
+    async def test_plain_command_skips_shell(self, monkeypatch):
+        """Test plain commands are exec'd directly and the rest use the shell."""
+        import asyncio
+        
+        calls = []
+        create_shell = asyncio.create_subprocess_shell
+        
+        async def spy_shell(command, **kwargs):
+            calls.append(command)
+            return await create_shell(command, **kwargs)
+        
+        monkeypatch.setattr(asyncio, "create_subprocess_shell", spy_shell)
+        tool = BashTool()
+        
+        result = await tool.execute(command="echo plain")
+        assert result.output == "plain\n"
+        assert calls == []
+        
+        result = await tool.execute(command="echo piped | tr a-z A-Z")
+        assert result.output == "PIPED\n"
+        
+        result = await tool.execute(command="export FOO")
+        assert result.success
+        assert calls == ["echo piped | tr a-z A-Z", "export FOO"]
+    
+    @pytest.mark.asyncio
+    async def test_output_truncated(self):
+        """Test that long output is capped at max_output_length."""
+        tool = BashTool(max_output_length=10)
+        
+        result = await tool.execute(command="printf '%0100d' 0")
+        assert result.success
+        assert result.output == "0" * 10 + "\n... (truncated)"
+    
+    @pytest.mark.asyncio
+    async def test_large_output_drained(self):
+        """Test that output past the limit is discarded, not buffered."""
+        tool = BashTool(max_output_length=10)
+        
+        result = await tool.execute(command="head -c 1000000 /dev/zero | tr '\\0' a")
+        assert result.success
+        assert result.output == "a" * 10 + "\n... (truncated)"
+    
     @pytest.mark.asyncio
     async def test_timeout(self):
         """Test command timeout."""
@@ -147,3 +238,212 @@ class TestSearchTool:
         )
         assert result.success
         assert len(result.output) == 2
+    
+    @pytest.mark.asyncio
+    async def test_search_reuses_compiled_pattern(self, temp_dir):
+        """Test repeated searches share one compiled regex."""
+        from openwork.tools.search_tool import _get_regex
+        
+        _get_regex.cache_clear()
+        tool = SearchTool()
+        (temp_dir / "file.txt").write_text("needle")
+        
+        for _ in range(3):
+            result = await tool.execute(pattern="needle", path=str(temp_dir))
+            assert len(result.output) == 1
+        assert _get_regex.cache_info().misses == 1
+        
+        result = await tool.execute(pattern="(", path=str(temp_dir))
+        assert not result.success
+        assert "Invalid regex" in result.error
+    
+    @pytest.mark.asyncio
+    async def test_search_bytes_and_text_patterns(self, temp_dir):
+        """Test ASCII patterns scan bytes and non-ASCII patterns still work."""
+        file_path = temp_dir / "mixed.txt"
+        file_path.write_bytes(b"Caf\xc3\xa9 au lait\nplain\n\xff bad byte CAF\xc3\x89\n")
+        tool = SearchTool()
+        
+        result = await tool.execute(pattern="caf", path=str(file_path))
+        assert [(r["line"], r["content"]) for r in result.output] == [
+            (1, "Café au lait"),
+            (3, "\ufffd bad byte CAFÉ"),
+        ]
+        
+        result = await tool.execute(pattern="café", path=str(file_path), case_sensitive=True)
+        assert [r["line"] for r in result.output] == []
+        
+        result = await tool.execute(pattern="Café", path=str(file_path), case_sensitive=True)
+        assert [r["line"] for r in result.output] == [1]
+    
+    @pytest.mark.asyncio
+    async def test_non_ascii_and_crlf_match_decoded_text(self, temp_dir):
+        """Test searches report the same lines as a per-line search of the decoded text."""
+        import re
+        
+        body = "café naïve\r\néword here\r\ndef f(x):\r\nline 1\r\n  \r\nabc\r\n(a+)+ zz\r\n"
+        (temp_dir / "mixed.txt").write_bytes(body.encode("utf-8"))
+        text = body.replace("\r\n", "\n")
+        tool = SearchTool()
+        
+        patterns = [
+            "caf.\\b", "na.ve", "caf\\w", "\\bword", ":$", "1$", "\\):$",
+            "\\s+$", "[^a-z]", "abc", "ab+c", "(a+)+ z", "\\r",
+        ]
+        for threshold in [SearchTool.MMAP_THRESHOLD, 8]:
+            tool.MMAP_THRESHOLD = threshold
+            for pattern in patterns:
+                regex = re.compile(pattern, re.IGNORECASE)
+                expected = [
+                    num for num, line in enumerate(text.split("\n"), 1) if regex.search(line)
+                ]
+                result = await tool.execute(pattern=pattern, path=str(temp_dir))
+                assert [r["line"] for r in result.output] == expected, pattern
+    
+    def test_matching_lines_matches_per_line_search(self):
+        """Test the whole-buffer scan reports the same lines as a per-line one."""
+        import re
+        from openwork.tools.search_tool import _matching_lines
+        
+        content = "ab\n\nb a\nc ab ab\n a\n"
+        for pattern in ["a", "^a", "b$", "^$", "\\s+a", "a.b", "\\Ab", "(?<!b) a", "\n"]:
+            regex = re.compile(pattern)
+            expected = [
+                (num, line, len(regex.findall(line)))
+                for num, line in enumerate(content.split("\n"), 1)
+                if regex.search(line)
+            ]
+            assert list(_matching_lines(content, regex)) == expected, pattern
+    
+    @pytest.mark.asyncio
+    async def test_search_many_files_in_batches(self, temp_dir):
+        """Test batched concurrent search covers every file and respects max_results."""
+        tool = SearchTool()
+        tool.BATCH_SIZE = 3
+        for i in range(10):
+            (temp_dir / f"f{i}.txt").write_text("hit\nhit\n")
+        
+        result = await tool.execute(pattern="hit", path=str(temp_dir), file_pattern="f*.txt")
+        assert result.metadata["files_searched"] == 10
+        assert len(result.output) == 20
+        walk_order = [path for path, _ in tool._iter_files(str(temp_dir.resolve()), "f*.txt", True)]
+        assert [r["file"] for r in result.output[::2]] == walk_order
+        
+        result = await tool.execute(pattern="hit", path=str(temp_dir), max_results=5)
+        assert len(result.output) == 5
+        assert result.metadata["truncated"]
+    
+    def test_iter_files_filters_in_walk(self, temp_dir):
+        """Test the scandir walk matches names and only recurses when asked."""
+        (temp_dir / "a.py").write_text("")
+        (temp_dir / "b.txt").write_text("")
+        (temp_dir / "pkg.py").mkdir()
+        (temp_dir / "pkg.py" / "c.py").write_text("")
+        tool = SearchTool()
+        
+        found = dict(tool._iter_files(str(temp_dir), "*.py", recursive=True))
+        assert found == {str(temp_dir / "a.py"): 0, str(temp_dir / "pkg.py" / "c.py"): 0}
+        found = dict(tool._iter_files(str(temp_dir), "*.py", recursive=False))
+        assert found == {str(temp_dir / "a.py"): 0}
+        
+        tool.max_file_size = 4
+        (temp_dir / "big.py").write_text("12345")
+        assert str(temp_dir / "big.py") not in dict(tool._iter_files(str(temp_dir), "*.py", recursive=False))
+    
+    def test_literal_patterns_skip_regex(self):
+        """Test plain-text patterns are found with bytes.find, folding ASCII case."""
+        import re
+        from openwork.tools.search_tool import _get_literal, _matching_lines
+        
+        regex = re.compile(b"todo", re.IGNORECASE)
+        assert _get_literal(regex) == b"todo"
+        assert _get_literal(re.compile(b"to.o")) is None
+        assert list(_matching_lines(b"# TODO\nx\ntodo Todo\n", regex)) == [
+            (1, b"# TODO", 1),
+            (3, b"todo Todo", 2),
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_binary_files_skipped(self, temp_dir):
+        """Test files with a NUL byte near the start are not searched."""
+        (temp_dir / "blob.bin").write_bytes(b"needle\x00needle")
+        (temp_dir / "text.txt").write_text("needle")
+        tool = SearchTool()
+        
+        result = await tool.execute(pattern="needle", path=str(temp_dir))
+        assert [r["file"] for r in result.output] == [str(temp_dir / "text.txt")]
+    
+    @pytest.mark.asyncio
+    async def test_large_files_memory_mapped(self, temp_dir):
+        """Test files above MMAP_THRESHOLD give the same results as small ones."""
+        body = "filler line\n" * 10000 + "Needle here\nneedle needle\n"
+        (temp_dir / "big.txt").write_text(body)
+        tool = SearchTool()
+        
+        for pattern in ["needle", "need.e", "^needle"]:
+            big = await tool.execute(pattern=pattern, path=str(temp_dir))
+            tool.MMAP_THRESHOLD = 10 ** 9
+            small = await tool.execute(pattern=pattern, path=str(temp_dir))
+            del tool.MMAP_THRESHOLD
+            assert big.output == small.output
+            assert big.output[-1]["line"] == 10002
+    
+    @pytest.mark.asyncio
+    async def test_complex_patterns_time_budget(self, temp_dir):
+        """Test backtracking-prone patterns are classified and given up on in time."""
+        from openwork.tools.search_tool import _classify
+        
+        assert _classify("TODO") == "literal"
+        assert _classify("def \\w+") == "simple"
+        assert _classify("(a+)+b") == "complex"
+        
+        (temp_dir / "file.txt").write_text("aaab\n" * 10)
+        tool = SearchTool()
+        
+        result = await tool.execute(pattern="(a+)+b", path=str(temp_dir))
+        assert len(result.output) == 10
+        
+        tool.COMPLEX_PATTERN_BUDGET = -1
+        result = await tool.execute(pattern="(a+)+b", path=str(temp_dir))
+        assert result.success
+        assert result.output == []
+    
+    @pytest.mark.asyncio
+    async def test_text_search_in_chunks(self, temp_dir):
+        """Test chunked text scanning matches a whole-file scan."""
+        body = "".join(f"ligne {i} café\r\n" if i % 3 else f"ligne {i}\n\n" for i in range(60))
+        (temp_dir / "notes.txt").write_bytes(body.encode("utf-8"))
+        tool = SearchTool()
+        
+        for pattern in ["café", "^$", "é\\s*$"]:
+            whole = await tool.execute(pattern=pattern, path=str(temp_dir))
+            tool.BINARY_PROBE_SIZE = 8
+            tool.CHUNK_SIZE = 50
+            chunked = await tool.execute(pattern=pattern, path=str(temp_dir))
+            del tool.BINARY_PROBE_SIZE, tool.CHUNK_SIZE
+            assert whole.output
+            assert chunked.output == whole.output, pattern
+    
+    @pytest.mark.asyncio
+    async def test_single_file_stat_once(self, temp_dir, monkeypatch):
+        """Test a single-file search stats the file once and honours max_file_size."""
+        import openwork.tools.search_tool as search_tool
+        
+        file_path = temp_dir / "test.txt"
+        file_path.write_text("hello\nworld\nhello")
+        stats = []
+        real_stat = os.stat
+        
+        def counting_stat(path, *args, **kwargs):
+            stats.append(str(path))
+            return real_stat(path, *args, **kwargs)
+        
+        monkeypatch.setattr(search_tool.os, "stat", counting_stat)
+        result = await SearchTool().execute(pattern="hello", path=str(file_path))
+        assert len(result.output) == 2
+        assert stats.count(str(file_path)) == 1
+        
+        result = await SearchTool(max_file_size=4).execute(pattern="hello", path=str(file_path))
+        assert result.success
+        assert result.output == []
+        assert result.metadata["files_searched"] == 0
@@ -1,5 +1,6 @@
 """Tests for web tool."""
 
+import httpx
 import pytest
 from openwork.tools.web_tool import WebTool
 
@@ -55,3 +56,83 @@ class TestWebTool:
         result = await tool.execute(method="GET")
         assert not result.success
         assert "required" in result.error.lower()
+    
+    @pytest.mark.asyncio
+    async def test_client_reused(self):
+        """Test requests share one pooled client until close()."""
+        tool = WebTool()
+        seen = []
+        
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request.extensions["timeout"]["read"])
+            return httpx.Response(200, json={"ok": True})
+        
+        tool._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        
+        result = await tool.execute(url="https://api.example.com/a")
+        assert result.success
+        assert result.output == {"ok": True}
+        first = tool._client
+        await tool.execute(url="https://api.example.com/b", timeout=5)
+        assert tool._client is first
+        assert seen == [30, 5]
+        
+        await tool.close()
+        assert tool._client is None
+    
+    @pytest.mark.asyncio
+    async def test_response_size_capped_while_streaming(self):
+        """Test an oversized body is rejected without reading all of it."""
+        tool = WebTool(max_response_size=100_000)
+        sent = []
+        
+        async def body():
+            for _ in range(1000):
+                sent.append(65536)
+                yield b"x" * 65536
+        
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/big":
+                return httpx.Response(200, content=body())
+            return httpx.Response(200, text="small body")
+        
+        tool._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        
+        result = await tool.execute(url="https://example.com/big")
+        assert not result.success
+        assert "too large" in result.error
+        assert len(sent) < 10
+        
+        result = await tool.execute(url="https://example.com/small")
+        assert result.output == "small body"
+        assert result.metadata["content_length"] == 10
+        await tool.close()
+    
+    def test_decode_body(self):
+        """Test JSON bodies are parsed and anything else is returned as text."""
+        assert WebTool._decode_body(bytearray(b'{"a": [1, 2]}'), "application/json", None) == {"a": [1, 2]}
+        assert WebTool._decode_body(bytearray(b"not json"), "application/json", None) == "not json"
+        assert WebTool._decode_body(bytearray("é".encode("latin-1")), "text/plain", "latin-1") == "é"
+    
+    def test_domain_lists_match_suffixes(self):
+        """Test blocked and allowed domains match themselves and subdomains only."""
+        tool = WebTool(
+            allowed_domains=["example.com", "api.test.org"],
+            blocked_domains=["bad.example.com"],
+        )
+        
+        assert tool._is_url_allowed("https://example.com/")[0]
+        assert tool._is_url_allowed("https://docs.example.com/")[0]
+        assert tool._is_url_allowed("https://v2.api.test.org/")[0]
+        assert not tool._is_url_allowed("https://test.org/")[0]
+        assert not tool._is_url_allowed("https://notexample.com/")[0]
+        assert tool._is_url_allowed("https://x.bad.example.com/") == (
+            False, "Blocked domain: x.bad.example.com"
+        )
+        
+        assert "docs.example.com" in tool._host_cache
+        
+        tool.blocked_domains = [*tool.blocked_domains, "docs.example.com"]
+        assert not tool._is_url_allowed("https://docs.example.com/other")[0]
+        tool.allowed_domains = None
+        assert tool._is_url_allowed("https://test.org/")[0]